@@ -0,0 +1,167 @@
+import argparse
+import csv
+import gc
+import json
+import multiprocessing
+import sys
+
+import degrees
+
+from util import positive_int
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Answers degrees queries as JSON lines.")
+    parser.add_argument("--workers", type=positive_int,
+                        help="answer the queries in that many processes")
+    parser.add_argument("directory")
+    parser.add_argument("queries", nargs="?",
+                        help="CSV file of source, target rows (default: stdin)")
+    args = parser.parse_args()
+    directory = args.directory
+
+    # Load data from files into memory only once for the whole batch
+    degrees.load_data(directory)
+
+    # Queries are read from the given file, or from stdin if there is none
+    if args.queries is not None:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = read_queries(f)
+    else:
+        queries = read_queries(sys.stdin)
+
+    # Results are streamed, so consumers see them as soon as they are ready
+    if args.workers is None:
+        results = run_batch(queries)
+    else:
+        results = run_batch_parallel(queries, args.workers, directory)
+    for result in results:
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+
+
+def read_queries(f):
+    """
+    Reads the queries as (line, source, target) tuples from a CSV file
+    with one pair of person IDs or names per row. Blank rows are skipped.
+    """
+    queries = []
+    for line, row in enumerate(csv.reader(f), start=1):
+        if not row:
+            continue
+        if len(row) != 2:
+            sys.exit(f"Line {line}: expected a source and a target")
+        queries.append((line, row[0].strip(), row[1].strip()))
+    return queries
+
+
+def resolve_person(text):
+    """
+    Returns the person_id for a person ID or an unambiguous name,
+    or None if there is no such person or the name is ambiguous.
+    """
+    if text in degrees.people:
+        return text
+    person_ids = degrees.names.get(text.lower(), set())
+    if len(person_ids) == 1:
+        return next(iter(person_ids))
+    return None
+
+
+def run_batch(queries):
+    """
+    Answers the (line, source, target) queries, yielding one result
+    dictionary per query. Queries sharing the same source are answered
+    together by a single BFS tree, so results are grouped by source
+    and each result carries the line of its query.
+    """
+    errors, groups = group_queries(queries)
+    yield from errors
+    for group in groups:
+        yield from answer_group(group)
+
+
+def run_batch_parallel(queries, workers, directory):
+    """
+    Answers the (line, source, target) queries like run_batch, but spreads
+    the groups of queries over a pool of worker processes and yields the
+    results in the same order as the queries.
+
+    Where processes can be forked, the workers share the data already
+    loaded by this process (copy-on-write) instead of receiving it with
+    every task. Otherwise each worker loads the data from directory once.
+    """
+    errors, groups = group_queries(queries)
+    pending = {result["line"]: result for result in errors}
+    lines = iter([line for line, _, _ in queries])
+    next_line = next(lines, None)
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        # Move the loaded data out of the garbage collector's reach, so the
+        # collector does not write to (and thus copy) the shared pages
+        gc.freeze()
+        pool = multiprocessing.get_context("fork").Pool(workers)
+    else:
+        pool = multiprocessing.Pool(
+            workers, initializer=degrees.load_data, initargs=(directory,))
+
+    with pool:
+        for group_results in pool.imap_unordered(answer_group, groups):
+            for result in group_results:
+                pending[result["line"]] = result
+
+            # Yield every result whose turn has come
+            while next_line in pending:
+                yield pending.pop(next_line)
+                next_line = next(lines, None)
+
+    # Only the errors of queries at the end of the input can be left
+    while next_line in pending:
+        yield pending.pop(next_line)
+        next_line = next(lines, None)
+
+
+def group_queries(queries):
+    """
+    Resolves the people of the (line, source, target) queries.
+    Returns the list of error results for the queries with an unknown
+    person, and the list of (source, [(line, target), ...]) groups.
+    """
+    errors = []
+    by_source = {}
+    for line, source_text, target_text in queries:
+        source = resolve_person(source_text)
+        target = resolve_person(target_text)
+        if source is None or target is None:
+            unknown = source_text if source is None else target_text
+            errors.append({"line": line, "error": f"Person not found or ambiguous: {unknown}"})
+            continue
+        by_source.setdefault(source, []).append((line, target))
+    return errors, list(by_source.items())
+
+
+def answer_group(group):
+    """
+    Answers a (source, [(line, target), ...]) group of queries
+    with a single BFS tree, returning the list of results.
+    """
+    source, targets = group
+    paths = degrees.shortest_paths_from(source, {target for _, target in targets})
+    return [query_result(line, source, target, paths[target]) for line, target in targets]
+
+
+def query_result(line, source, target, path):
+    """
+    Returns the result dictionary for a single answered query.
+    """
+    return {
+        "line": line,
+        "source": source,
+        "target": target,
+        "degrees": None if path is None else len(path),
+        "path": path,
+    }
+
+
+if __name__ == "__main__":
+    main()
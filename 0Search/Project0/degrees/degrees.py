@@ -1,7 +1,14 @@
+import argparse
 import csv
+import gc
+import marshal
+import mmap
+import os
+import struct
 import sys
 
-from util import Node, StackFrontier, QueueFrontier
+from nameindex import NameIndex
+from util import Node, StackFrontier, QueueFrontier, SearchStats
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +19,33 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Exact, prefix and fuzzy lookups of names, rebuilt every time data is loaded
+name_index = NameIndex()
 
-def load_data(directory):
+# Maps person_ids to the label of their connected component,
+# and each label to the number of people in that component
+components = {}
+component_sizes = {}
+
+# Binary snapshot of the loaded data, written next to the CSV files.
+# Bump the version whenever the layout of the dictionaries changes
+SNAPSHOT_FILE = "degrees.snapshot"
+SNAPSHOT_VERSION = 2
+CSV_FILES = ("people.csv", "movies.csv", "stars.csv")
+
+
+def load_data(directory, use_snapshot=True):
     """
     Load data from CSV files into memory.
+
+    If use_snapshot is True, the data is read from the binary snapshot
+    of a previous run when it is still up to date with the CSV files,
+    and the snapshot is (re)written after parsing the CSV files otherwise.
     """
+    if use_snapshot and load_snapshot(directory):
+        name_index.rebuild(names, people)
+        return
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,11 +80,183 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    name_index.rebuild(names, people)
+    compute_components()
+
+    if use_snapshot:
+        save_snapshot(directory)
+
+
+def compute_components():
+    """
+    Labels every person with their connected component, joining
+    the stars of every movie with a union-find structure.
+    """
+    parent = {person_id: person_id for person_id in people}
+
+    def find(person_id):
+        # Path halving keeps the trees shallow
+        while parent[person_id] != person_id:
+            parent[person_id] = parent[parent[person_id]]
+            person_id = parent[person_id]
+        return person_id
+
+    for movie in movies.values():
+        stars = list(movie["stars"])
+        for star_id in stars[1:]:
+            root = find(stars[0])
+            other = find(star_id)
+            if other != root:
+                parent[other] = root
+
+    components.clear()
+    component_sizes.clear()
+    labels = {}
+    for person_id in people:
+        label = labels.setdefault(find(person_id), len(labels))
+        components[person_id] = label
+        component_sizes[label] = component_sizes.get(label, 0) + 1
+
+
+def connected(source, target):
+    """
+    Returns False if the two people are known to be in different
+    connected components, True otherwise.
+    """
+    if source not in components or target not in components:
+        return True
+    return components[source] == components[target]
+
+
+def component_stats(top=10):
+    """
+    Returns a dictionary describing the connected components:
+    how many there are, the sizes of the top largest ones,
+    and how many components there are of every size.
+    """
+    sizes = sorted(component_sizes.values(), reverse=True)
+    histogram = {}
+    for size in sizes:
+        histogram[size] = histogram.get(size, 0) + 1
+    return {
+        "components": len(sizes),
+        "people": sum(sizes),
+        "largest": sizes[:top],
+        "sizes": histogram,
+    }
+
+
+def snapshot_key(directory):
+    """
+    Returns the key identifying the current version of the CSV files
+    and of the snapshot format.
+    """
+    key = [SNAPSHOT_VERSION, marshal.version, sys.implementation.cache_tag]
+    for filename in CSV_FILES:
+        stat = os.stat(f"{directory}/{filename}")
+        key.append((filename, stat.st_size, stat.st_mtime_ns))
+    return tuple(key)
+
+
+def load_snapshot(directory):
+    """
+    Fills names, people, movies and components from the snapshot in directory.
+    Returns False, leaving them untouched, if there is no snapshot
+    or it does not match the CSV files anymore.
+    """
+    try:
+        key = snapshot_key(directory)
+    except OSError:
+        return False
+    snapshot = read_keyed(f"{directory}/{SNAPSHOT_FILE}", key, load_without_gc)
+    if snapshot is None:
+        return False
+
+    snapshot_names, snapshot_people, snapshot_movies, snapshot_components = snapshot
+    names.update(snapshot_names)
+    people.update(snapshot_people)
+    movies.update(snapshot_movies)
+    components.update(snapshot_components)
+    for label in components.values():
+        component_sizes[label] = component_sizes.get(label, 0) + 1
+    return True
+
+
+def read_keyed(path, key, loads=marshal.loads):
+    """
+    Returns the data of a file written by write_keyed, unmarshalled
+    with loads, or None if there is no such file, it cannot be read,
+    or it was written with another key.
+    """
+    try:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                # The file starts with the length of the key, then the
+                # key, so a stale file is detected without reading the rest
+                with memoryview(data) as view:
+                    header_length, = struct.unpack_from("<Q", view)
+                    header_end = 8 + header_length
+                    if marshal.loads(view[8:header_end]) != key:
+                        return None
+                    return loads(view[header_end:])
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+
+
+def load_without_gc(data):
+    """
+    Unmarshals data with the garbage collector paused, since the millions
+    of containers it creates would otherwise trigger many useless collections.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return marshal.loads(data)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def save_snapshot(directory):
+    """
+    Writes names, people, movies and components to the snapshot in directory.
+    Failing to write it (e.g. in a read-only directory) is not an error.
+    """
+    try:
+        key = snapshot_key(directory)
+    except OSError:
+        return
+    write_keyed(f"{directory}/{SNAPSHOT_FILE}", key, (names, people, movies, components))
+
+
+def write_keyed(path, key, data):
+    """
+    Writes the length of the marshalled key, the key and then data,
+    marshalled, to the file at path, for read_keyed.
+    Failing to write it (e.g. in a read-only directory) is not an error.
+    """
+    try:
+        header = marshal.dumps(key)
+        # Write to a temporary file first so a concurrent run
+        # never sees a half-written file
+        with open(f"{path}.tmp", "wb") as f:
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            marshal.dump(data, f)
+        os.replace(f"{path}.tmp", path)
+    except OSError:
+        pass
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    # The optional "--search" flag selects which search algorithm to use,
+    # so that the different versions can be compared on the same queries
+    parser = argparse.ArgumentParser(description="Degrees of separation between two people.")
+    parser.add_argument("--search", choices=SEARCH_ALGORITHMS, default="bfs")
+    parser.add_argument("directory", nargs="?", default="large")
+    args = parser.parse_args()
+    search = args.search
+    directory = args.directory
 
     # Load data from files into memory
     print("Loading data...")
@@ -72,7 +273,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = SEARCH_ALGORITHMS[search](source, target)
 
 
     # this part of the code is to output the result of the shortest
@@ -80,24 +281,37 @@ def main():
     if path is None:
         print("Not connected.")
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+        print_path(source, path)
+
+
+def print_path(source, path):
+    """
+    Prints the degrees of separation of a path found from the source.
+    """
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = people[path[i][1]]["name"]
+        person2 = people[path[i + 1][1]]["name"]
+        movie = movies[path[i + 1][0]]["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
 # This is the function we have to implement
-def shortest_path(source, target):
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
     """
+    if stats is None:
+        stats = SearchStats()
+
+    # People in different components can be answered right away
+    if not connected(source, target):
+        return None
 
     # TO DO
 
@@ -120,6 +334,7 @@ def shortest_path(source, target):
             return None
 
         # Choose a node from the frontier
+        stats.expand(len(frontier.frontier))
         node = frontier.remove()
         num_explored += 1
 
@@ -136,6 +351,7 @@ def shortest_path(source, target):
 
         # Compute neighbours of the current node
         neighbors = neighbors_for_person(node.state)
+        stats.neighbor_calls += 1
 
 
         # Add neighbors to frontier
@@ -168,6 +384,188 @@ def solution_found(node):
     return solution
 
 
+def shortest_path_lazy(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, treating movies as nodes
+    of their own: the cast of each movie is expanded only once,
+    and co-stars are checked one at a time as they are generated.
+
+    If no possible path, returns None.
+    """
+    if stats is None:
+        stats = SearchStats()
+    if source == target:
+        return []
+    if not connected(source, target):
+        return None
+
+    frontier = QueueFrontier()
+    frontier.add(Node(state=source, parent=None, action=None))
+
+    # People already added to the frontier and movies already expanded
+    reached = {source}
+    visited_movies = set()
+
+    while not frontier.empty():
+        stats.expand(len(frontier.frontier))
+        node = frontier.remove()
+        stats.neighbor_calls += 1
+        for movie_id, person_id in costars(node.state, visited_movies):
+            if person_id in reached:
+                continue
+            reached.add(person_id)
+            child = Node(state=person_id, parent=node, action=movie_id)
+            # Stop right away, without generating the rest of the co-stars
+            if person_id == target:
+                return solution_found(child)
+            frontier.add(child)
+
+    return None
+
+
+def costars(person_id, visited_movies):
+    """
+    Yields (movie_id, person_id) pairs for people who starred with
+    a given person, in the movies that are not in visited_movies yet.
+    Those movies are added to visited_movies as they are expanded,
+    since all of their stars are reached the first time.
+    """
+    for movie_id in people[person_id]["movies"]:
+        if movie_id in visited_movies:
+            continue
+        visited_movies.add(movie_id)
+        for star_id in movies[movie_id]["stars"]:
+            yield movie_id, star_id
+
+
+def shortest_paths_from(source, targets, stats=None):
+    """
+    Returns a dictionary mapping each of the targets to the shortest list
+    of (movie_id, person_id) pairs that connect the source to it (None if
+    there is no possible path), growing a single BFS tree from the source.
+    """
+    if stats is None:
+        stats = SearchStats()
+    remaining = set(targets)
+    paths = {}
+    if source in remaining:
+        paths[source] = []
+        remaining.remove(source)
+
+    # Targets in other components are not worth waiting for
+    for target in [target for target in remaining if not connected(source, target)]:
+        paths[target] = None
+        remaining.remove(target)
+
+    # Every person that has already been added to the tree
+    reached = {source}
+    frontier = QueueFrontier()
+    frontier.add(Node(state=source, parent=None, action=None))
+
+    # Stop as soon as every target has been reached
+    while remaining and not frontier.empty():
+        stats.expand(len(frontier.frontier))
+        node = frontier.remove()
+        stats.neighbor_calls += 1
+        for movie_id, person_id in neighbors_for_person(node.state):
+            if person_id in reached:
+                continue
+            reached.add(person_id)
+            child = Node(state=person_id, parent=node, action=movie_id)
+            if person_id in remaining:
+                paths[person_id] = solution_found(child)
+                remaining.remove(person_id)
+            frontier.add(child)
+
+    for target in remaining:
+        paths[target] = None
+    return paths
+
+
+def shortest_path_bidirectional(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing one frontier
+    from the source and another one from the target at the same time.
+
+    If no possible path, returns None.
+    """
+    if stats is None:
+        stats = SearchStats()
+    if source == target:
+        return []
+    if not connected(source, target):
+        return None
+
+    # Each side maps every person it reached to the (movie_id, person_id)
+    # pair that leads one step back towards the side's own root
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    while forward_frontier and backward_frontier:
+
+        # Always expand the smaller frontier, one whole level at a time
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_level(
+                forward_frontier, forward, backward, stats)
+        else:
+            backward_frontier, meeting = expand_level(
+                backward_frontier, backward, forward, stats)
+
+        # The first person reached by both sides lies on a shortest path,
+        # since every person in a level is at the same distance from its root
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_level(frontier, parents, other_parents, stats):
+    """
+    Expands every person in the frontier, recording the new people
+    in parents. Returns the next level of the frontier and the first
+    person that was already reached from the other side (or None).
+    """
+    next_frontier = []
+    for i, person_id in enumerate(frontier):
+        stats.expand(len(frontier) - i + len(next_frontier))
+        stats.neighbor_calls += 1
+        for movie_id, neighbor in neighbors_for_person(person_id):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (movie_id, person_id)
+            if neighbor in other_parents:
+                return next_frontier, neighbor
+            next_frontier.append(neighbor)
+    return next_frontier, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Builds the list of (movie_id, person_id) pairs going from
+    the source to the target through the meeting person.
+    """
+    # Walk back from the meeting person to the source
+    solution = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, previous = forward[person_id]
+        solution.append((movie_id, person_id))
+        person_id = previous
+    solution.reverse()
+
+    # Walk forward from the meeting person to the target
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, following = backward[person_id]
+        solution.append((movie_id, following))
+        person_id = following
+    return solution
+
+
 
 def person_id_for_name(name):
     """
@@ -208,5 +606,13 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+# Search algorithms that can be selected from the command line
+SEARCH_ALGORITHMS = {
+    "bfs": shortest_path,
+    "bidirectional": shortest_path_bidirectional,
+    "lazy": shortest_path_lazy,
+}
+
+
 if __name__ == "__main__":
     main()
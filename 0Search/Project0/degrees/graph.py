@@ -0,0 +1,199 @@
+import csv
+import sys
+import time
+import tracemalloc
+
+from array import array
+from collections import deque
+
+import degrees
+
+
+class CompactGraph():
+    """
+    Actor-movie graph where every person and movie id is interned to a
+    dense integer, and the person -> movies and movie -> stars adjacency
+    lists are stored as CSR arrays: the neighbours of i are
+    targets[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, person_ids, movie_ids, credits):
+        """
+        Builds the graph from the list of person ids, the list of movie ids
+        and an iterable of (person_id, movie_id) credits (duplicates and
+        credits of unknown people or movies are ignored).
+        """
+        self.person_ids = list(person_ids)
+        self.movie_ids = list(movie_ids)
+        self.person_index = {person_id: i for i, person_id in enumerate(self.person_ids)}
+        self.movie_index = {movie_id: i for i, movie_id in enumerate(self.movie_ids)}
+
+        # Each credit is encoded as a single integer, sorting them
+        # groups the movies of every person together
+        num_movies = len(self.movie_ids)
+        codes = set()
+        for person_id, movie_id in credits:
+            person = self.person_index.get(person_id)
+            movie = self.movie_index.get(movie_id)
+            if person is not None and movie is not None:
+                codes.add(person * num_movies + movie)
+        codes = sorted(codes)
+
+        # Person -> movies
+        self.person_offsets = offsets_from_counts(
+            len(self.person_ids), (code // num_movies for code in codes))
+        self.person_movies = array("l", (code % num_movies for code in codes))
+
+        # Movie -> stars, placing each credit in its movie's slot
+        self.movie_offsets = offsets_from_counts(num_movies, self.person_movies)
+        self.movie_stars = array("l", [0]) * len(codes)
+        position = array("l", self.movie_offsets[:-1])
+        for code in codes:
+            movie = code % num_movies
+            self.movie_stars[position[movie]] = code // num_movies
+            position[movie] += 1
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Reads the graph straight from the CSV files,
+        without building the dictionaries of degrees.load_data.
+        """
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            person_ids = [row["id"] for row in csv.DictReader(f)]
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            movie_ids = [row["id"] for row in csv.DictReader(f)]
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            credits = ((row["person_id"], row["movie_id"]) for row in csv.DictReader(f))
+            return cls(person_ids, movie_ids, credits)
+
+    @classmethod
+    def from_dicts(cls, people, movies):
+        """
+        Builds the graph from the people and movies dictionaries
+        filled by degrees.load_data.
+        """
+        credits = (
+            (person_id, movie_id)
+            for person_id, person in people.items()
+            for movie_id in person["movies"]
+        )
+        return cls(people, movies, credits)
+
+    def movies_of(self, person):
+        """
+        Returns the integer ids of the movies of an integer person id.
+        """
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """
+        Returns the integer ids of the stars of an integer movie id.
+        """
+        return self.movie_stars[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for movie in self.movies_of(self.person_index[person_id]):
+            movie_id = self.movie_ids[movie]
+            for person in self.stars_of(movie):
+                neighbors.add((movie_id, self.person_ids[person]))
+        return neighbors
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        source = self.person_index[source]
+        target = self.person_index[target]
+        if source == target:
+            return []
+
+        # Parent person and joining movie of every reached person, -1 if unreached
+        parent_person = array("l", [-1]) * len(self.person_ids)
+        parent_movie = array("l", [-1]) * len(self.person_ids)
+        parent_person[source] = source
+
+        frontier = deque([source])
+        while frontier:
+            person = frontier.popleft()
+            for movie in self.movies_of(person):
+                for neighbor in self.stars_of(movie):
+                    if parent_person[neighbor] != -1:
+                        continue
+                    parent_person[neighbor] = person
+                    parent_movie[neighbor] = movie
+                    if neighbor == target:
+                        return self.solution_found(target, source, parent_person, parent_movie)
+                    frontier.append(neighbor)
+        return None
+
+    def solution_found(self, target, source, parent_person, parent_movie):
+        """
+        Follows the parent arrays back from the target to the source and
+        returns the path as (movie_id, person_id) pairs of string ids.
+        """
+        solution = []
+        person = target
+        while person != source:
+            solution.append((self.movie_ids[parent_movie[person]], self.person_ids[person]))
+            person = parent_person[person]
+        solution.reverse()
+        return solution
+
+
+def offsets_from_counts(size, keys):
+    """
+    Returns the CSR offsets array of length size + 1
+    for the given sequence of row keys.
+    """
+    offsets = array("l", [0]) * (size + 1)
+    for key in keys:
+        offsets[key + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    return offsets
+
+
+def measure(function, *args, **kwargs):
+    """
+    Returns the result of calling the function, the memory it left
+    allocated in bytes and the time it took in seconds.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, allocated, elapsed
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python graph.py [directory]")
+    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+
+    # Memory of the dictionaries filled by degrees.load_data, parsed from
+    # the CSV files every time (the snapshot would change the figure),
+    # including the name index and component labels it also builds
+    _, dict_bytes, dict_time = measure(degrees.load_data, directory, use_snapshot=False)
+    print(f"Dictionaries:  {dict_bytes / 2**10:12.1f} KiB, loaded in {dict_time:.2f}s "
+          f"(with name index and component labels)")
+
+    # Memory of the compact graph, read directly from the CSV files
+    graph, compact_bytes, compact_time = measure(CompactGraph.from_csv, directory)
+    print(f"Compact graph: {compact_bytes / 2**10:12.1f} KiB, loaded in {compact_time:.2f}s")
+    print(f"People: {len(graph.person_ids)}, movies: {len(graph.movie_ids)}, "
+          f"credits: {len(graph.person_movies)}")
+
+
+if __name__ == "__main__":
+    main()
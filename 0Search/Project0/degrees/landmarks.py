@@ -0,0 +1,430 @@
+import heapq
+import sys
+import time
+
+from array import array
+from collections import deque
+
+import degrees
+
+from util import SearchStats
+
+# Index of BFS distances from a few landmark people, written next to
+# the CSV files. Bump the version whenever the file layout changes
+INDEX_FILE = "landmarks.index"
+INDEX_VERSION = 1
+
+# Distances are stored as unsigned shorts, with this value for unreachable people
+UNREACHED = 0xFFFF
+
+
+class LandmarkIndex():
+    """
+    BFS distances from a set of landmark people to every person.
+    By the triangle inequality, for every landmark L the distance
+    between a and b is at least |d(L, a) - d(L, b)| and at most
+    d(L, a) + d(L, b), which shortest_path uses to prune its search.
+    """
+
+    def __init__(self, person_ids, landmarks, distances):
+        self.person_ids = list(person_ids)
+        self.position = {person_id: i for i, person_id in enumerate(self.person_ids)}
+        self.landmarks = list(landmarks)
+        self.distances = list(distances)
+
+    @classmethod
+    def build(cls, num_landmarks=8, seeds=("Kevin Bacon",)):
+        """
+        Builds the index over the data loaded by degrees.load_data,
+        using the people named in seeds and then the people with the
+        most co-stars as landmarks, up to num_landmarks of them.
+        """
+        landmarks = []
+        for name in seeds:
+            for person_id in degrees.names.get(name.lower(), set()):
+                if len(landmarks) < num_landmarks:
+                    landmarks.append(person_id)
+        for person_id in sorted(degrees.people, key=costar_count, reverse=True):
+            if len(landmarks) == num_landmarks:
+                break
+            if person_id not in landmarks:
+                landmarks.append(person_id)
+
+        index = cls(degrees.people, landmarks, [])
+        for landmark in landmarks:
+            index.distances.append(index.distances_from(landmark))
+        return index
+
+    def distances_from(self, landmark):
+        """
+        Returns the array of BFS distances from the landmark to every person.
+        """
+        distances = array("H", [UNREACHED]) * len(self.person_ids)
+        distances[self.position[landmark]] = 0
+        frontier = deque([landmark])
+
+        # Each movie's cast only needs to be expanded once
+        visited_movies = set()
+        while frontier:
+            person_id = frontier.popleft()
+            distance = distances[self.position[person_id]] + 1
+            for _, star_id in degrees.costars(person_id, visited_movies):
+                position = self.position[star_id]
+                if distances[position] == UNREACHED:
+                    distances[position] = distance
+                    frontier.append(star_id)
+        return distances
+
+    def add_person(self, person_id):
+        """
+        Makes room for a new person, who is not connected to anyone yet.
+        """
+        self.position[person_id] = len(self.person_ids)
+        self.person_ids.append(person_id)
+        for distances in self.distances:
+            distances.append(UNREACHED)
+
+    def remove_person(self, person_id):
+        """
+        Forgets a person, whose credits must have been removed already.
+        A removed landmark stops being used as one.
+        """
+        if person_id in self.landmarks:
+            i = self.landmarks.index(person_id)
+            del self.landmarks[i]
+            del self.distances[i]
+        position = self.position.pop(person_id)
+        self.person_ids[position] = None
+
+    def compact(self):
+        """
+        Drops the positions left empty by removed people,
+        moving everyone after them up.
+        """
+        kept = [i for i, person_id in enumerate(self.person_ids) if person_id is not None]
+        if len(kept) == len(self.person_ids):
+            return
+        self.person_ids = [self.person_ids[i] for i in kept]
+        self.position = {person_id: i for i, person_id in enumerate(self.person_ids)}
+        self.distances = [array("H", (distances[i] for i in kept))
+                          for distances in self.distances]
+
+    def add_edges(self, edges):
+        """
+        Updates the distances after the (person_id, person_id) pairs
+        in edges started sharing a movie. Only the people whose distance
+        to a landmark gets shorter are visited.
+        """
+        for distances in self.distances:
+            improved = []
+            for a, b in edges:
+                for u, v in ((a, b), (b, a)):
+                    distance = distances[self.position[u]]
+                    if distance != UNREACHED and distance + 1 < distances[self.position[v]]:
+                        distances[self.position[v]] = distance + 1
+                        heapq.heappush(improved, (distance + 1, v))
+            self.settle(distances, improved)
+
+    def remove_edges(self, edges):
+        """
+        Updates the distances after the (person_id, person_id) pairs
+        in edges stopped sharing any movie. Only the people who lost
+        every shortest path to a landmark are visited.
+        """
+        for landmark, distances in zip(self.landmarks, self.distances):
+            # Find the people left without a neighbor one step closer
+            # to the landmark, and then everyone they were supporting
+            invalid = set()
+            queue = deque(person_id for edge in edges for person_id in edge)
+            while queue:
+                person_id = queue.popleft()
+                distance = distances[self.position[person_id]]
+                if person_id == landmark or person_id in invalid or distance == UNREACHED:
+                    continue
+                neighbors = [star_id for _, star_id in degrees.neighbors_for_person(person_id)]
+                if any(distances[self.position[star_id]] == distance - 1 and star_id not in invalid
+                       for star_id in neighbors):
+                    continue
+                invalid.add(person_id)
+                queue.extend(star_id for star_id in neighbors
+                             if distances[self.position[star_id]] == distance + 1)
+
+            # Give them their new distances, starting from their neighbors
+            # whose distances are still valid
+            for person_id in invalid:
+                distances[self.position[person_id]] = UNREACHED
+            improved = []
+            for person_id in invalid:
+                for _, star_id in degrees.neighbors_for_person(person_id):
+                    distance = distances[self.position[star_id]]
+                    if star_id not in invalid and distance != UNREACHED \
+                            and distance + 1 < distances[self.position[person_id]]:
+                        distances[self.position[person_id]] = distance + 1
+                        heapq.heappush(improved, (distance + 1, person_id))
+            self.settle(distances, improved)
+
+    def settle(self, distances, improved):
+        """
+        Propagates the improved (distance, person_id) heap of
+        distances to the neighbors of those people, Dijkstra style.
+        """
+        while improved:
+            distance, person_id = heapq.heappop(improved)
+            if distance > distances[self.position[person_id]]:
+                continue
+            for _, star_id in degrees.neighbors_for_person(person_id):
+                position = self.position[star_id]
+                if distance + 1 < distances[position]:
+                    distances[position] = distance + 1
+                    heapq.heappush(improved, (distance + 1, star_id))
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper, landmark) where lower and upper bound the
+        number of degrees of separation between two people, and upper is
+        the length of the path through landmark. Returns None if the
+        landmarks prove that the people are not connected.
+        """
+        person = self.position[source]
+        goal = self.position[target]
+        lower = 0
+        upper = UNREACHED
+        best = None
+        for landmark, distances in zip(self.landmarks, self.distances):
+            a = distances[person]
+            b = distances[goal]
+            # A landmark reaching only one of them proves they are not connected
+            if (a == UNREACHED) != (b == UNREACHED):
+                return None
+            if a == UNREACHED:
+                continue
+            lower = max(lower, abs(a - b))
+            if a + b < upper:
+                upper = a + b
+                best = landmark
+        return lower, upper, best
+
+    def lower_bound(self, person_id, target):
+        """
+        Returns a lower bound of the number of degrees of separation
+        between two people.
+        """
+        person = self.position[person_id]
+        goal = self.position[target]
+        bound = 0
+        for distances in self.distances:
+            a = distances[person]
+            b = distances[goal]
+            if a != UNREACHED and b != UNREACHED:
+                bound = max(bound, abs(a - b))
+        return bound
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        The landmarks give a path through one of them, which is returned
+        right away when its length matches the lower bound. Otherwise a
+        bidirectional search looks for a shorter path, skipping people
+        whose lower bound shows they cannot be on one.
+
+        If no possible path, returns None.
+        """
+        if stats is None:
+            stats = SearchStats()
+        if source == target:
+            return []
+        bounds = self.bounds(source, target)
+        if bounds is None:
+            return None
+        lower, upper, landmark = bounds
+
+        if landmark is None or lower < upper:
+            path = self.bidirectional_search(source, target, upper, stats)
+            if path is not None:
+                return path
+        if landmark is None:
+            return None
+
+        # Going through the landmark is as short as it gets
+        return self.path_to(landmark, source, reverse=True) + self.path_to(landmark, target)
+
+    def bidirectional_search(self, source, target, upper, stats):
+        """
+        Returns the shortest path between source and target if it is
+        shorter than upper, or None otherwise.
+        """
+        forward = {source: None}
+        backward = {target: None}
+        forward_frontier = [source]
+        backward_frontier = [target]
+        forward_depth = backward_depth = 0
+
+        # A meeting at the next level gives a path of length
+        # forward_depth + backward_depth + 1, only search while it helps
+        while forward_frontier and backward_frontier and forward_depth + backward_depth + 1 < upper:
+            if len(forward_frontier) <= len(backward_frontier):
+                forward_depth += 1
+                forward_frontier, meeting = self.expand_level(
+                    forward_frontier, forward, backward, target, forward_depth, upper, stats)
+            else:
+                backward_depth += 1
+                backward_frontier, meeting = self.expand_level(
+                    backward_frontier, backward, forward, source, backward_depth, upper, stats)
+            if meeting is not None:
+                return degrees.join_paths(meeting, forward, backward)
+
+        return None
+
+    def expand_level(self, frontier, parents, other_parents, goal, depth, upper, stats):
+        """
+        Expands every person in the frontier like degrees.expand_level,
+        but leaves out the people at the given depth whose lower bound
+        to the goal rules out a path shorter than upper.
+        """
+        next_frontier = []
+        for i, person_id in enumerate(frontier):
+            stats.expand(len(frontier) - i + len(next_frontier))
+            stats.neighbor_calls += 1
+            for movie_id, neighbor in degrees.neighbors_for_person(person_id):
+                if neighbor in parents:
+                    continue
+                if neighbor not in other_parents and depth + self.lower_bound(neighbor, goal) >= upper:
+                    continue
+                parents[neighbor] = (movie_id, person_id)
+                if neighbor in other_parents:
+                    return next_frontier, neighbor
+                next_frontier.append(neighbor)
+        return next_frontier, None
+
+    def path_to(self, landmark, person_id, reverse=False):
+        """
+        Returns the list of (movie_id, person_id) pairs going from the
+        landmark to the person, or from the person to the landmark if
+        reverse is True, following the landmark's distances downhill.
+        """
+        distances = self.distances[self.landmarks.index(landmark)]
+        steps = []
+        while person_id != landmark:
+            distance = distances[self.position[person_id]]
+            movie_id, previous = self.step_towards(person_id, distances, distance - 1)
+            steps.append((movie_id, person_id, previous))
+            person_id = previous
+
+        if reverse:
+            return [(movie_id, following) for movie_id, _, following in steps]
+        steps.reverse()
+        return [(movie_id, person_id) for movie_id, person_id, _ in steps]
+
+    def step_towards(self, person_id, distances, distance):
+        """
+        Returns a (movie_id, person_id) pair of a co-star
+        at the given distance from the landmark.
+        """
+        for movie_id in degrees.people[person_id]["movies"]:
+            for star_id in degrees.movies[movie_id]["stars"]:
+                if distances[self.position[star_id]] == distance:
+                    return movie_id, star_id
+        raise ValueError("landmark distances are inconsistent with the data")
+
+    def save(self, directory):
+        """
+        Writes the index to the index file in directory, compacted first.
+        Failing to write it (e.g. in a read-only directory) is not an error.
+        """
+        self.compact()
+        try:
+            key = index_key(directory)
+        except OSError:
+            return
+        degrees.write_keyed(f"{directory}/{INDEX_FILE}", key, (
+            self.person_ids,
+            self.landmarks,
+            [distances.tobytes() for distances in self.distances],
+        ))
+
+    @classmethod
+    def load(cls, directory):
+        """
+        Reads the index from the index file in directory.
+        Returns None if there is no index or it does not match
+        the CSV files anymore.
+        """
+        try:
+            key = index_key(directory)
+        except OSError:
+            return None
+        index = degrees.read_keyed(f"{directory}/{INDEX_FILE}", key)
+        if index is None:
+            return None
+
+        person_ids, landmarks, buffers = index
+        distances = []
+        for buffer in buffers:
+            distances.append(array("H"))
+            distances[-1].frombytes(buffer)
+        return cls(person_ids, landmarks, distances)
+
+
+def index_key(directory):
+    """
+    Returns the key identifying the current version of the CSV files
+    and of the index format.
+    """
+    return (INDEX_VERSION,) + degrees.snapshot_key(directory)
+
+
+def costar_count(person_id):
+    """
+    Returns the number of (movie, co-star) pairs of a person,
+    used to pick well-connected people as landmarks.
+    """
+    return sum(len(degrees.movies[movie_id]["stars"]) - 1
+               for movie_id in degrees.people[person_id]["movies"])
+
+
+def load_or_build(directory, num_landmarks=8):
+    """
+    Returns the index of directory, building and saving it
+    first if it is missing or stale.
+    """
+    index = LandmarkIndex.load(directory)
+    if index is None or len(index.landmarks) != num_landmarks:
+        index = LandmarkIndex.build(num_landmarks)
+        index.save(directory)
+    return index
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python landmarks.py directory [landmarks]")
+    directory = sys.argv[1]
+    num_landmarks = int(sys.argv[2]) if len(sys.argv) == 3 else 8
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    start = time.perf_counter()
+    index = load_or_build(directory, num_landmarks)
+    print(f"Index ready in {time.perf_counter() - start:.2f}s "
+          f"with landmarks: {', '.join(degrees.people[l]['name'] for l in index.landmarks)}")
+
+    source = degrees.person_id_for_name(input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = degrees.person_id_for_name(input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    start = time.perf_counter()
+    path = index.shortest_path(source, target)
+    print(f"Answered in {(time.perf_counter() - start) * 1000:.2f}ms")
+
+    if path is None:
+        print("Not connected.")
+    else:
+        degrees.print_path(source, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+import itertools
+
+from collections import deque
+
+import degrees
+
+
+class LiveGraph():
+    """
+    Long-running view of the data loaded by degrees.load_data that can be
+    changed in place: people, movies and credits can be added and removed,
+    and the name index, the component labels (and landmark index, if given)
+    are kept consistent by updating only what the change touches.
+    """
+
+    def __init__(self, landmark_index=None):
+        self.landmarks = landmark_index
+
+        # New components get labels never used before
+        self.labels = itertools.count(max(degrees.component_sizes, default=-1) + 1)
+
+    def add_person(self, person_id, name, birth):
+        """
+        Adds a person who has not starred in any movie yet.
+        """
+        if person_id in degrees.people:
+            raise ValueError(f"person {person_id} already exists")
+        degrees.people[person_id] = {"name": name, "birth": birth, "movies": set()}
+        key = name.lower()
+        degrees.names.setdefault(key, set()).add(person_id)
+        degrees.name_index.add(key)
+        label = next(self.labels)
+        degrees.components[person_id] = label
+        degrees.component_sizes[label] = 1
+        if self.landmarks is not None:
+            self.landmarks.add_person(person_id)
+
+    def remove_person(self, person_id):
+        """
+        Removes a person, together with all of their credits.
+        """
+        for movie_id in list(degrees.people[person_id]["movies"]):
+            self.remove_credit(person_id, movie_id)
+
+        person = degrees.people.pop(person_id)
+        key = person["name"].lower()
+        degrees.names[key].discard(person_id)
+        if not degrees.names[key]:
+            del degrees.names[key]
+            degrees.name_index.discard(key)
+        # Without credits the person is alone in their component
+        del degrees.component_sizes[degrees.components.pop(person_id)]
+        if self.landmarks is not None:
+            self.landmarks.remove_person(person_id)
+
+    def add_movie(self, movie_id, title, year):
+        """
+        Adds a movie without any stars yet.
+        """
+        if movie_id in degrees.movies:
+            raise ValueError(f"movie {movie_id} already exists")
+        degrees.movies[movie_id] = {"title": title, "year": year, "stars": set()}
+
+    def remove_movie(self, movie_id):
+        """
+        Removes a movie, together with all of its credits.
+        """
+        for person_id in list(degrees.movies[movie_id]["stars"]):
+            self.remove_credit(person_id, movie_id)
+        del degrees.movies[movie_id]
+
+    def add_credit(self, person_id, movie_id):
+        """
+        Records that a person starred in a movie.
+        """
+        person = degrees.people[person_id]
+        movie = degrees.movies[movie_id]
+        if movie_id in person["movies"]:
+            return
+
+        # Only co-stars who did not share a movie with the person before
+        # are new neighbors
+        edges = [(person_id, star_id) for star_id in movie["stars"]
+                 if not person["movies"] & degrees.people[star_id]["movies"]]
+        person["movies"].add(movie_id)
+        movie["stars"].add(person_id)
+        degrees.name_index.update(person["name"].lower())
+        for _, star_id in edges:
+            self.merge_components(person_id, star_id)
+        if self.landmarks is not None and edges:
+            self.landmarks.add_edges(edges)
+
+    def remove_credit(self, person_id, movie_id):
+        """
+        Records that a person did not star in a movie after all.
+        """
+        person = degrees.people[person_id]
+        movie = degrees.movies[movie_id]
+        if movie_id not in person["movies"]:
+            return
+        person["movies"].discard(movie_id)
+        movie["stars"].discard(person_id)
+        degrees.name_index.update(person["name"].lower())
+
+        # Co-stars still sharing another movie with the person stay neighbors
+        edges = [(person_id, star_id) for star_id in movie["stars"]
+                 if not person["movies"] & degrees.people[star_id]["movies"]]
+        for _, star_id in edges:
+            self.split_components(person_id, star_id)
+        if self.landmarks is not None and edges:
+            self.landmarks.remove_edges(edges)
+
+    def merge_components(self, a, b):
+        """
+        Joins the components of two people who now share a movie,
+        relabelling the people of the smaller one.
+        """
+        label_a = degrees.components[a]
+        label_b = degrees.components[b]
+        if label_a == label_b:
+            return
+        if degrees.component_sizes[label_a] < degrees.component_sizes[label_b]:
+            a, b, label_a, label_b = b, a, label_b, label_a
+        for person_id in component_members(b, label_b):
+            degrees.components[person_id] = label_a
+        degrees.component_sizes[label_a] += degrees.component_sizes.pop(label_b)
+
+    def split_components(self, a, b):
+        """
+        Checks whether two people who no longer share a movie are still
+        connected, searching from both at once so the cost is bounded by
+        the smaller side, and gives a new label to the part that split off.
+        """
+        if degrees.components[a] != degrees.components[b]:
+            return
+        part = split_off_part(a, b)
+        if part is None:
+            return
+        label = degrees.components[a]
+        new_label = next(self.labels)
+        for person_id in part:
+            degrees.components[person_id] = new_label
+        degrees.component_sizes[label] -= len(part)
+        degrees.component_sizes[new_label] = len(part)
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target in the current graph,
+        using the landmark index when there is one.
+
+        If no possible path, returns None.
+        """
+        if self.landmarks is not None:
+            return self.landmarks.shortest_path(source, target)
+        return degrees.shortest_path_bidirectional(source, target)
+
+
+def component_members(person_id, label):
+    """
+    Returns the set of people connected to a person
+    through people whose component has the given label.
+    """
+    members = {person_id}
+    frontier = deque([person_id])
+    while frontier:
+        for _, star_id in degrees.neighbors_for_person(frontier.popleft()):
+            if star_id not in members and degrees.components[star_id] == label:
+                members.add(star_id)
+                frontier.append(star_id)
+    return members
+
+
+def split_off_part(a, b):
+    """
+    Grows a BFS from each of two people in turn, one person at a time.
+    Returns None if the searches meet, or else all the people reached
+    by the first search to run out of people to expand.
+    """
+    reached = ({a}, {b})
+    frontiers = (deque([a]), deque([b]))
+    while True:
+        for side in (0, 1):
+            if not frontiers[side]:
+                return reached[side]
+            for _, star_id in degrees.neighbors_for_person(frontiers[side].popleft()):
+                if star_id in reached[1 - side]:
+                    return None
+                if star_id not in reached[side]:
+                    reached[side].add(star_id)
+                    frontiers[side].append(star_id)
@@ -0,0 +1,89 @@
+import argparse
+import asyncio
+import csv
+import itertools
+import statistics
+import time
+
+from urllib.parse import urlencode
+
+from util import port_number, positive_int
+
+HOST = "127.0.0.1"
+PORT = 8050
+
+
+async def client(queries, port, latencies, count):
+    """
+    Sends queries over a single keep-alive connection, one at a time,
+    until count requests have been sent, recording each latency.
+    """
+    reader, writer = await asyncio.open_connection(HOST, port)
+    try:
+        for _ in range(count):
+            source, target = next(queries)
+            request = f"GET /path?{urlencode({'source': source, 'target': target})} HTTP/1.1\r\n" \
+                      f"Host: {HOST}\r\n\r\n"
+            start = time.perf_counter()
+            writer.write(request.encode())
+            await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+
+
+async def read_response(reader):
+    """
+    Reads a whole response and returns its body.
+    """
+    await reader.readline()
+    length = 0
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return await reader.readexactly(length)
+
+
+async def run(queries, port, concurrency, requests):
+    """
+    Spreads the requests over concurrent clients and returns
+    the list of latencies and the total time taken.
+    """
+    latencies = []
+    counts = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(queries, port, latencies, count) for count in counts if count))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sends degrees queries to server.py.")
+    parser.add_argument("--port", type=port_number, default=PORT)
+    parser.add_argument("--concurrency", type=positive_int, default=16,
+                        help="number of concurrent connections")
+    parser.add_argument("--requests", type=positive_int, default=1000,
+                        help="total number of requests")
+    parser.add_argument("queries", help="CSV file of source, target rows")
+    args = parser.parse_args()
+
+    # Queries are (source, target) rows, sent over and over in order
+    with open(args.queries, encoding="utf-8") as f:
+        rows = [(row[0].strip(), row[1].strip()) for row in csv.reader(f) if row]
+    queries = itertools.cycle(rows)
+
+    latencies, elapsed = asyncio.run(
+        run(queries, args.port, args.concurrency, args.requests))
+
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"Requests: {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.1f} requests/sec)")
+    print(f"Latency p50: {p50 * 1000:.2f}ms, p99: {p99 * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,504 @@
+import heapq
+import sys
+import time
+
+from bisect import bisect_left, bisect_right
+
+# Sorts after every character, so prefix + LAST_CHARACTER
+# is greater than any name starting with prefix
+LAST_CHARACTER = chr(sys.maxunicode)
+
+# Prefixes matching more names than this only rank the best ones,
+# found with the ranking tree, instead of all of them
+RANKED_SCAN = 64
+
+# Fraction of a fuzzy query searched forwards with at most half of the edits,
+# the rest of the query being searched backwards with the other half
+SPLIT = (3, 4)
+
+
+class Ranking():
+    """
+    Segment tree over a list of scores, where every node holds the
+    position of the lowest score in its range (the first one on ties),
+    to find the lowest scores of a range without looking at all of them.
+    """
+
+    def __init__(self, scores):
+        self.scores = scores
+        self.size = 1
+        while self.size < len(scores):
+            self.size *= 2
+        self.best = [-1] * (2 * self.size)
+        self.best[self.size:self.size + len(scores)] = range(len(scores))
+        for node in range(self.size - 1, 0, -1):
+            self.best[node] = self.better(self.best[2 * node], self.best[2 * node + 1])
+
+    def better(self, a, b):
+        """
+        Returns whichever of two positions has the lower score,
+        where -1 stands for no position.
+        """
+        if a < 0:
+            return b
+        if b < 0:
+            return a
+        if self.scores[b] < self.scores[a] or (self.scores[b] == self.scores[a] and b < a):
+            return b
+        return a
+
+    def update(self, position, score):
+        """
+        Changes the score at a position.
+        """
+        self.scores[position] = score
+        node = (self.size + position) // 2
+        while node:
+            self.best[node] = self.better(self.best[2 * node], self.best[2 * node + 1])
+            node //= 2
+
+    def lowest(self, start, end):
+        """
+        Returns the position of the lowest score in [start, end), or -1 if empty.
+        """
+        found = -1
+        low, high = start + self.size, end + self.size
+        while low < high:
+            if low & 1:
+                found = self.better(found, self.best[low])
+                low += 1
+            if high & 1:
+                high -= 1
+                found = self.better(found, self.best[high])
+            low //= 2
+            high //= 2
+        return found
+
+    def top(self, start, end, count):
+        """
+        Returns the positions of the count lowest scores in [start, end),
+        lowest first, splitting the range around every position found.
+        """
+        found = []
+        ranges = []
+        position = self.lowest(start, end)
+        if position >= 0:
+            ranges.append((self.scores[position], position, start, end))
+        while ranges and len(found) < count:
+            _, position, start, end = heapq.heappop(ranges)
+            found.append(position)
+            for low, high in ((start, position), (position + 1, end)):
+                best = self.lowest(low, high)
+                if best >= 0:
+                    heapq.heappush(ranges, (self.scores[best], best, low, high))
+        return found
+
+
+class SplitSearch():
+    """
+    Edit distance automaton of a query, where a match may only use
+    split_distance of its max_distance edits before it first reaches
+    the end of the first split characters of query.
+
+    Every row is a list of bit masks, one per number of edits, where
+    bit j is set if the first j characters of query are within that many
+    edits of the name read so far, so a whole row takes a few integer
+    operations instead of a loop over query.
+    """
+
+    def __init__(self, query, split, split_distance, max_distance):
+        self.query = query
+        self.split = split
+        self.split_distance = split_distance
+        self.max_distance = max_distance
+        self.split_bit = 1 << split
+        self.end_bit = 1 << len(query)
+
+        # Bit j of masks[character] is set if query[j - 1] is character,
+        # characters not in query match nothing, and all give the same row
+        self.masks = {}
+        for j, character in enumerate(query, start=1):
+            self.masks[character] = self.masks.get(character, 0) | (1 << j)
+        self.characters = sorted(self.masks)
+
+        # viable[left][edits] has the bits of the prefixes of query that can
+        # still be matched with left more characters and edits edits so far,
+        # where past split_distance only the prefixes beyond the split can
+        self.viable = []
+        beyond_split = ((self.end_bit << 1) - 1) & ~(self.split_bit - 1)
+        for left in range(len(query) + max_distance + 1):
+            bits = []
+            for edits in range(max_distance + 1):
+                slack = max_distance - edits
+                low = len(query) - left - slack
+                width = 2 * slack + 1 + min(low, 0)
+                mask = ((1 << width) - 1) << max(low, 0) if width > 0 else 0
+                bits.append(mask & beyond_split if edits > split_distance else mask)
+            self.viable.append(bits)
+
+    def first_row(self):
+        """
+        Returns the row of the empty name.
+        """
+        row = []
+        for edits in range(self.max_distance + 1):
+            states = (1 << (edits + 1)) - 1
+            if self.split > self.split_distance:
+                states &= ~self.split_bit
+            row.append(states)
+        return row
+
+    def next_row(self, row, character):
+        """
+        Returns the row that follows row after adding character to the name.
+        """
+        mask = self.masks.get(character, 0)
+        above = row[0]
+        states = (above << 1) & mask
+        new_row = [states]
+        for edits in range(1, len(row)):
+            # A match or substitution moves on in query, as does an insertion,
+            # but only close enough matches may move past the split, while
+            # a deletion stays where it is, even at the split
+            moved = ((row[edits] << 1) & mask) | ((above | states) << 1)
+            if edits > self.split_distance:
+                moved &= ~self.split_bit
+            states |= moved | above
+            new_row.append(states)
+            above = row[edits]
+        return new_row
+
+    def skip(self, key, depth):
+        """
+        Returns the first name after key, in sorted order, that does not
+        start with key[:depth + 1] or with any other prefix giving the same
+        row, when the row of that prefix cannot lead to a match.
+        """
+        if key[depth] in self.masks:
+            return key[:depth + 1] + LAST_CHARACTER
+        i = bisect_right(self.characters, key[depth])
+        if i == len(self.characters):
+            return key[:depth] + LAST_CHARACTER
+        return key[:depth] + self.characters[i]
+
+    def anchors(self, keys):
+        """
+        Returns the (prefix, row) pairs of the shortest prefixes of the
+        sorted list keys that reach the split within split_distance edits.
+        """
+        row = self.first_row()
+        if row[self.split_distance] & self.split_bit:
+            return [("", row)]
+        before_split = (self.split_bit << 1) - 1
+
+        found = []
+        rows = [row]
+        previous = ""
+        i = 0
+        while i < len(keys):
+            key = keys[i]
+            common = min(common_prefix_length(previous, key), len(rows) - 1)
+            del rows[common + 1:]
+            previous = key
+
+            skip = None
+            for depth in range(common, len(key)):
+                row = self.next_row(rows[-1], key[depth])
+                if row[self.split_distance] & self.split_bit:
+                    found.append((key[:depth + 1], row))
+                    skip = key[:depth + 1] + LAST_CHARACTER
+                    break
+                if not row[self.split_distance] & before_split:
+                    skip = self.skip(key, depth)
+                    break
+                rows.append(row)
+            if skip is None:
+                i += 1
+            else:
+                i = bisect_left(keys, skip, i + 1)
+        return found
+
+    def walk(self, keys, prefix, row):
+        """
+        Returns the keys of a sorted list of keys of the same length that
+        start with prefix and are within max_distance edits of query,
+        mapped to their distance, given the row of prefix. The keys are
+        walked like a trie, sharing the rows of common prefixes, and every
+        key under a prefix is skipped as soon as it cannot lead to a match.
+        """
+        start = bisect_left(keys, prefix)
+        end = bisect_left(keys, prefix + LAST_CHARACTER, start)
+        matches = {}
+        rows = [row]
+        previous = prefix
+        i = start
+        while i < end:
+            key = keys[i]
+            common = max(len(prefix), min(common_prefix_length(previous, key),
+                                          len(prefix) + len(rows) - 1))
+            del rows[common - len(prefix) + 1:]
+            previous = key
+
+            pruned = False
+            for depth in range(common, len(key)):
+                row = self.next_row(rows[-1], key[depth])
+                for states, viable in zip(row, self.viable[len(key) - depth - 1]):
+                    if states & viable:
+                        break
+                else:
+                    pruned = True
+                    break
+                rows.append(row)
+            if pruned:
+                i = bisect_left(keys, self.skip(key, depth), i + 1, end)
+                continue
+
+            for distance, states in enumerate(rows[-1]):
+                if states & self.end_bit:
+                    matches[key] = distance
+                    break
+            i += 1
+        return matches
+
+
+class NameIndex():
+    """
+    Sorted array of the lowercase names of degrees.names, searched with
+    bisect for exact and prefix lookups, and walked like a trie (sharing
+    the edit distance rows of common prefixes) for fuzzy lookups, where
+    the names are also kept reversed and by length, together with a
+    ranking of the names by their number of movies.
+    """
+
+    def __init__(self, names=None, people=None):
+        self.names = {}
+        self.people = {}
+        self.keys = []
+        self.reversed_keys = []
+        self.by_length = {}
+        self.reversed_by_length = {}
+        self.ranking = None
+        if names is not None:
+            self.rebuild(names, people)
+
+    def rebuild(self, names, people):
+        """
+        Indexes the names dictionary (lowercase name -> set of person_ids),
+        with people used to describe and rank the candidates.
+        """
+        self.names = names
+        self.people = people
+        self.keys = sorted(names)
+        self.reversed_keys = sorted(key[::-1] for key in self.keys)
+        self.by_length = {}
+        self.reversed_by_length = {}
+        for key in self.keys:
+            self.by_length.setdefault(len(key), []).append(key)
+            self.reversed_by_length.setdefault(len(key), []).append(key[::-1])
+        for keys in self.reversed_by_length.values():
+            keys.sort()
+        self.ranking = Ranking([self.score(key) for key in self.keys])
+
+    def score(self, key):
+        """
+        Returns the rank of a lowercase name in prefix lookups, lower first:
+        minus the most movies of any person with that name.
+        """
+        return -max(len(self.people[person_id]["movies"]) for person_id in self.names[key])
+
+    def add(self, key):
+        """
+        Indexes a lowercase name that was added to the names dictionary.
+        """
+        if insert_sorted(self.keys, key):
+            insert_sorted(self.reversed_keys, key[::-1])
+            insert_sorted(self.by_length.setdefault(len(key), []), key)
+            insert_sorted(self.reversed_by_length.setdefault(len(key), []), key[::-1])
+            # Positions after the new name have moved, rank them again when needed
+            self.ranking = None
+
+    def discard(self, key):
+        """
+        Forgets a lowercase name that was removed from the names dictionary.
+        """
+        if remove_sorted(self.keys, key):
+            remove_sorted(self.reversed_keys, key[::-1])
+            remove_sorted(self.by_length[len(key)], key)
+            remove_sorted(self.reversed_by_length[len(key)], key[::-1])
+            self.ranking = None
+
+    def update(self, key):
+        """
+        Ranks a lowercase name again after the movies of its people changed.
+        """
+        i = bisect_left(self.keys, key)
+        if self.ranking is not None and i < len(self.keys) and self.keys[i] == key:
+            self.ranking.update(i, self.score(key))
+
+    def exact(self, name):
+        """
+        Returns the candidates whose name is exactly name (ignoring case).
+        """
+        key = name.lower()
+        return self.candidates([(0, key)]) if key in self.names else []
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to limit candidates whose name starts with prefix.
+        """
+        prefix = prefix.lower()
+        start = bisect_left(self.keys, prefix)
+        end = bisect_left(self.keys, prefix + LAST_CHARACTER, start)
+        if limit is None or end - start <= RANKED_SCAN:
+            return self.candidates(((0, key) for key in self.keys[start:end]), limit)
+
+        # Every name has at least one person, and all the people of a name rank
+        # below its best one, so the best people are among the best limit names
+        if self.ranking is None:
+            self.ranking = Ranking([self.score(key) for key in self.keys])
+        positions = self.ranking.top(start, end, limit)
+        return self.candidates(((0, self.keys[i]) for i in positions), limit)
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Returns up to limit candidates whose name is within max_distance
+        edits (insertions, deletions or substitutions) of name,
+        closest first.
+        """
+        query = name.lower()
+
+        # A name within max_distance edits of query either reaches the end
+        # of the first SPLIT of query with at most half of them, or leaves it
+        # with fewer than the other half left, so searching the names forwards
+        # for the first case and reversed for the second one finds them all
+        split = len(query) * SPLIT[0] // SPLIT[1]
+        forwards = max_distance // 2
+        backwards = max_distance - forwards - 1
+        matches = {}
+        searches = (
+            (SplitSearch(query, split, forwards, max_distance),
+             self.keys, self.by_length, False),
+            (SplitSearch(query[::-1], len(query) - split, backwards, max_distance),
+             self.reversed_keys, self.reversed_by_length, True),
+        )
+        for search, keys, by_length, reverse in searches:
+            if search.split_distance < 0:
+                continue
+
+            # Names starting with a prefix that reached the split are only
+            # walked further in the lists of names of a length that can match
+            for prefix, row in search.anchors(keys):
+                for length in range(len(query) - max_distance, len(query) + max_distance + 1):
+                    if length not in by_length:
+                        continue
+                    found = search.walk(by_length[length], prefix, row)
+                    for key, distance in found.items():
+                        if reverse:
+                            key = key[::-1]
+                        if distance < matches.get(key, max_distance + 1):
+                            matches[key] = distance
+        return self.candidates(((distance, key) for key, distance in matches.items()), limit)
+
+    def search(self, name, max_distance=2, limit=10):
+        """
+        Returns up to limit candidates for name: exact matches first,
+        then names starting with it, then names within max_distance edits.
+        """
+        found = self.exact(name)
+        if len(found) < limit:
+            add_new(found, self.prefix(name, limit))
+        if len(found) < limit:
+            add_new(found, self.fuzzy(name, max_distance, limit))
+        return found[:limit]
+
+    def candidates(self, matches, limit=None):
+        """
+        Turns (distance, lowercase name) matches into candidate dictionaries
+        with the id, name, birth and distance of every matching person,
+        ranked by distance and then by number of movies.
+        """
+        ranked = (
+            (distance, -len(self.people[person_id]["movies"]), key, person_id)
+            for distance, key in matches
+            for person_id in self.names[key]
+        )
+        if limit is None:
+            ranked = sorted(ranked)
+        else:
+            ranked = heapq.nsmallest(limit, ranked)
+
+        found = []
+        for distance, _, _, person_id in ranked:
+            person = self.people[person_id]
+            found.append({
+                "id": person_id,
+                "name": person["name"],
+                "birth": person["birth"],
+                "distance": distance,
+            })
+        return found
+
+
+def add_new(found, candidates):
+    """
+    Appends to found the candidates whose person is not in it yet.
+    """
+    seen = {candidate["id"] for candidate in found}
+    found.extend(candidate for candidate in candidates if candidate["id"] not in seen)
+
+
+def insert_sorted(keys, key):
+    """
+    Inserts key into a sorted list unless it is already there,
+    and returns whether it was inserted.
+    """
+    i = bisect_left(keys, key)
+    if i < len(keys) and keys[i] == key:
+        return False
+    keys.insert(i, key)
+    return True
+
+
+def remove_sorted(keys, key):
+    """
+    Removes key from a sorted list if it is there,
+    and returns whether it was removed.
+    """
+    i = bisect_left(keys, key)
+    if i == len(keys) or keys[i] != key:
+        return False
+    del keys[i]
+    return True
+
+
+def common_prefix_length(a, b):
+    """
+    Returns the length of the longest common prefix of two strings.
+    """
+    length = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        length += 1
+    return length
+
+
+def main():
+    if len(sys.argv) != 3:
+        sys.exit("Usage: python nameindex.py directory name")
+
+    import degrees
+    degrees.load_data(sys.argv[1])
+
+    start = time.perf_counter()
+    candidates = degrees.name_index.search(sys.argv[2])
+    elapsed = time.perf_counter() - start
+
+    for candidate in candidates:
+        print(f"ID: {candidate['id']}, Name: {candidate['name']}, "
+              f"Birth: {candidate['birth']}, Distance: {candidate['distance']}")
+    print(f"Found {len(candidates)} candidates in {elapsed * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+import argparse
+import csv
+import heapq
+import marshal
+import os
+import struct
+import sys
+
+from functools import lru_cache
+
+import degrees
+
+from util import Node, QueueFrontier, non_negative_int, positive_int
+
+# Adjacency files written under the data directory, each one a sorted
+# list of fixed-size (key, value) records of integer ids
+ADJACENCY_DIRECTORY = "adjacency"
+BY_PERSON_FILE = "by_person.bin"
+BY_MOVIE_FILE = "by_movie.bin"
+KEY_FILE = "key"
+ADJACENCY_VERSION = 1
+
+RECORD = struct.Struct("<QQ")
+
+# Number of credits sorted in memory at once, and number of
+# adjacency lists kept in memory, by default
+CHUNK_SIZE = 1_000_000
+CACHE_SIZE = 100_000
+
+
+def build(directory, chunk_size=CHUNK_SIZE):
+    """
+    Builds the adjacency files of directory from its stars.csv, reading
+    and sorting at most chunk_size credits in memory at a time (external
+    merge sort), so memory does not depend on the size of the dataset.
+
+    Person and movie ids must be integers. Unlike degrees.load_data,
+    credits are not checked against people.csv and movies.csv,
+    since that would need every id in memory.
+    """
+    output = f"{directory}/{ADJACENCY_DIRECTORY}"
+    os.makedirs(output, exist_ok=True)
+
+    # Sort the credits chunk by chunk into runs, both by person and by movie
+    person_runs = []
+    movie_runs = []
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader)
+        chunk = []
+        for row in reader:
+            chunk.append((int(row[0]), int(row[1])))
+            if len(chunk) == chunk_size:
+                write_runs(output, chunk, person_runs, movie_runs)
+                chunk = []
+        if chunk:
+            write_runs(output, chunk, person_runs, movie_runs)
+
+    # Merge the runs into the final, deduplicated adjacency files
+    merge_runs(person_runs, f"{output}/{BY_PERSON_FILE}")
+    merge_runs(movie_runs, f"{output}/{BY_MOVIE_FILE}")
+
+    with open(f"{output}/{KEY_FILE}", "wb") as f:
+        marshal.dump(adjacency_key(directory), f)
+
+
+def write_runs(output, chunk, person_runs, movie_runs):
+    """
+    Writes a chunk of (person, movie) credits as two sorted runs,
+    one keyed by person and one keyed by movie.
+    """
+    number = len(person_runs)
+    person_runs.append(f"{output}/person_run{number}.tmp")
+    movie_runs.append(f"{output}/movie_run{number}.tmp")
+
+    chunk.sort()
+    write_records(person_runs[-1], chunk)
+    chunk = [(movie, person) for person, movie in chunk]
+    chunk.sort()
+    write_records(movie_runs[-1], chunk)
+
+
+def write_records(filename, records):
+    """
+    Writes (key, value) records to a file.
+    """
+    with open(filename, "wb") as f:
+        for record in records:
+            f.write(RECORD.pack(*record))
+
+
+def read_records(filename):
+    """
+    Yields the (key, value) records of a file, one at a time.
+    """
+    with open(filename, "rb") as f:
+        while True:
+            data = f.read(RECORD.size * 4096)
+            if not data:
+                return
+            yield from RECORD.iter_unpack(data)
+
+
+def merge_runs(runs, filename):
+    """
+    Merges sorted runs into a single sorted file without duplicates,
+    then removes the runs.
+    """
+    with open(filename, "wb") as f:
+        previous = None
+        for record in heapq.merge(*(read_records(run) for run in runs)):
+            if record != previous:
+                f.write(RECORD.pack(*record))
+                previous = record
+    for run in runs:
+        os.remove(run)
+
+
+def adjacency_key(directory):
+    """
+    Returns the key identifying the current version of stars.csv
+    and of the adjacency files format.
+    """
+    stat = os.stat(f"{directory}/stars.csv")
+    return (ADJACENCY_VERSION, stat.st_size, stat.st_mtime_ns)
+
+
+def is_up_to_date(directory):
+    """
+    Returns True if the adjacency files of directory match its stars.csv.
+    """
+    try:
+        with open(f"{directory}/{ADJACENCY_DIRECTORY}/{KEY_FILE}", "rb") as f:
+            return marshal.load(f) == adjacency_key(directory)
+    except (OSError, ValueError, EOFError, TypeError):
+        return False
+
+
+class AdjacencyFile():
+    """
+    Sorted file of (key, value) records, where the values of a key
+    are found with a binary search over the file.
+    """
+
+    def __init__(self, filename):
+        self.file = open(filename, "rb")
+        self.count = os.fstat(self.file.fileno()).st_size // RECORD.size
+
+    def record(self, i):
+        self.file.seek(i * RECORD.size)
+        return RECORD.unpack(self.file.read(RECORD.size))
+
+    def values(self, key):
+        """
+        Returns the tuple of values of a key.
+        """
+        # Find the first record with that key
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self.record(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        # Read records until the key changes
+        values = []
+        self.file.seek(low * RECORD.size)
+        while True:
+            data = self.file.read(RECORD.size * 64)
+            for record_key, value in RECORD.iter_unpack(data):
+                if record_key != key:
+                    return tuple(values)
+                values.append(value)
+            if len(data) < RECORD.size * 64:
+                return tuple(values)
+
+    def close(self):
+        self.file.close()
+
+
+class DiskGraph():
+    """
+    Actor-movie graph paged in from the adjacency files, keeping only the
+    cache_size most recently used adjacency lists of each kind in memory.
+    """
+
+    def __init__(self, directory, cache_size=CACHE_SIZE):
+        output = f"{directory}/{ADJACENCY_DIRECTORY}"
+        self.by_person = AdjacencyFile(f"{output}/{BY_PERSON_FILE}")
+        self.by_movie = AdjacencyFile(f"{output}/{BY_MOVIE_FILE}")
+        self.movies_of = lru_cache(maxsize=cache_size)(self.by_person.values)
+        self.stars_of = lru_cache(maxsize=cache_size)(self.by_movie.values)
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for movie in self.movies_of(int(person_id)):
+            for person in self.stars_of(movie):
+                neighbors.add((str(movie), str(person)))
+        return neighbors
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        if source == target:
+            return []
+
+        frontier = QueueFrontier()
+        frontier.add(Node(state=source, parent=None, action=None))
+        reached = {source}
+
+        while not frontier.empty():
+            node = frontier.remove()
+            for movie_id, person_id in self.neighbors_for_person(node.state):
+                if person_id in reached:
+                    continue
+                reached.add(person_id)
+                child = Node(state=person_id, parent=node, action=movie_id)
+                if person_id == target:
+                    return degrees.solution_found(child)
+                frontier.add(child)
+
+        return None
+
+    def close(self):
+        self.by_person.close()
+        self.by_movie.close()
+
+
+def main():
+    # Optional flags limit how much data is held in memory
+    parser = argparse.ArgumentParser(description="Degrees of separation read from disk.")
+    parser.add_argument("--chunk-size", type=positive_int, default=CHUNK_SIZE,
+                        help="records sorted in memory at once while building")
+    parser.add_argument("--cache-size", type=non_negative_int, default=CACHE_SIZE,
+                        help="adjacency lists cached while searching")
+    parser.add_argument("directory")
+    parser.add_argument("source", help="person id")
+    parser.add_argument("target", help="person id")
+    args = parser.parse_args()
+    directory, source, target = args.directory, args.source, args.target
+
+    if not is_up_to_date(directory):
+        print("Building adjacency files...")
+        build(directory, args.chunk_size)
+
+    graph = DiskGraph(directory, args.cache_size)
+    path = graph.shortest_path(source, target)
+    graph.close()
+
+    if path is None:
+        print("Not connected.")
+    else:
+        print(f"{len(path)} degrees of separation.")
+        for i, (movie_id, person_id) in enumerate(path, start=1):
+            print(f"{i}: movie {movie_id}, person {person_id}")
+
+    # resource is only available on Unix, where ru_maxrss is in kilobytes
+    # on Linux (and in bytes on macOS)
+    try:
+        import resource
+    except ImportError:
+        return
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak /= 1024
+    print(f"Peak memory: {peak / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
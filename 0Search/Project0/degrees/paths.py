@@ -0,0 +1,169 @@
+import argparse
+import heapq
+import itertools
+import sys
+
+import degrees
+
+from util import Node, QueueFrontier, positive_int
+
+
+def all_shortest_paths(source, target, limit=None):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connect the source to the target, up to limit of them.
+
+    The BFS levels between the source and the target are computed once,
+    as a DAG of predecessors, and the paths are generated lazily from it,
+    so only the paths actually consumed are ever built.
+    """
+    if limit == 0:
+        return
+    if source == target:
+        yield from itertools.islice([[]], limit)
+        return
+
+    # Maps every reached person to all the (movie_id, person_id) pairs
+    # that lead to it from the previous BFS level
+    predecessors = {source: []}
+    level = [source]
+    while level and target not in predecessors:
+        next_level = {}
+        for person_id in level:
+            for movie_id, neighbor in degrees.neighbors_for_person(person_id):
+                if neighbor not in predecessors:
+                    next_level.setdefault(neighbor, []).append((movie_id, person_id))
+        predecessors.update(next_level)
+        level = list(next_level)
+
+    if target in predecessors:
+        yield from itertools.islice(paths_to(target, predecessors), limit)
+
+
+def paths_to(person_id, predecessors):
+    """
+    Yields every path from the root of the predecessors DAG to a person.
+    """
+    if not predecessors[person_id]:
+        yield []
+        return
+    for movie_id, previous in predecessors[person_id]:
+        for path in paths_to(previous, predecessors):
+            yield path + [(movie_id, person_id)]
+
+
+def k_shortest_paths(source, target, k=None):
+    """
+    Yields the shortest lists of (movie_id, person_id) pairs that connect
+    the source to the target without visiting anyone twice, in order of
+    length, up to k of them (Yen's algorithm). Paths going through the
+    same people in different movies are different paths.
+    """
+    if k == 0:
+        return
+    path = restricted_shortest_path(source, target, set(), set())
+    if path is None:
+        return
+    found = [path]
+    yield path
+
+    # Heap of (length, tie breaker, path) of the candidate paths
+    counter = itertools.count()
+    candidates = []
+    seen = {tuple(path)}
+
+    while k is None or len(found) < k:
+        # Deviate from the last path found at each of its people in turn
+        last = found[-1]
+        people = [source] + [person_id for _, person_id in last]
+        for i in range(len(last)):
+            root = last[:i]
+            spur = people[i]
+
+            # Forbid the steps already taken from this root by found paths,
+            # and the people of the root, so the new path stays simple
+            banned_steps = {path[i] for path in found if path[:i] == root}
+            banned_people = set(people[:i])
+            spur_path = restricted_shortest_path(spur, target, banned_people, banned_steps)
+            if spur_path is None:
+                continue
+            path = root + spur_path
+            if tuple(path) not in seen:
+                seen.add(tuple(path))
+                heapq.heappush(candidates, (len(path), next(counter), path))
+
+        if not candidates:
+            return
+        _, _, path = heapq.heappop(candidates)
+        found.append(path)
+        yield path
+
+
+def restricted_shortest_path(source, target, banned_people, banned_steps):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs that connect
+    the source to the target without going through banned_people, and
+    without taking any of the (movie_id, person_id) banned_steps
+    right from the source.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    frontier = QueueFrontier()
+    frontier.add(Node(state=source, parent=None, action=None))
+    reached = set(banned_people) | {source}
+
+    while not frontier.empty():
+        node = frontier.remove()
+        for movie_id, person_id in degrees.neighbors_for_person(node.state):
+            if person_id in reached:
+                continue
+            if node.parent is None and (movie_id, person_id) in banned_steps:
+                continue
+            reached.add(person_id)
+            child = Node(state=person_id, parent=node, action=movie_id)
+            if person_id == target:
+                return degrees.solution_found(child)
+            frontier.add(child)
+
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lists several paths between two people.")
+    parser.add_argument("--yen", action="store_true",
+                        help="list the k shortest simple paths instead of all the shortest ones")
+    parser.add_argument("--limit", type=positive_int, default=10,
+                        help="maximum number of paths to print")
+    parser.add_argument("directory", nargs="?", default="large")
+    args = parser.parse_args()
+    directory = args.directory
+
+    print("Loading data...")
+    degrees.load_data(directory)
+    print("Data loaded.")
+
+    source = degrees.person_id_for_name(input("Name: "))
+    if source is None:
+        sys.exit("Person not found.")
+    target = degrees.person_id_for_name(input("Name: "))
+    if target is None:
+        sys.exit("Person not found.")
+
+    if args.yen:
+        paths = k_shortest_paths(source, target, args.limit)
+    else:
+        paths = all_shortest_paths(source, target, args.limit)
+
+    count = 0
+    for count, path in enumerate(paths, start=1):
+        print(f"Path {count}:")
+        degrees.print_path(source, path)
+    if count == 0:
+        print("Not connected.")
+
+
+if __name__ == "__main__":
+    main()
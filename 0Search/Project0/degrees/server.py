@@ -0,0 +1,177 @@
+import argparse
+import asyncio
+import gc
+import json
+import multiprocessing
+
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import degrees
+
+from batch import resolve_person
+from util import non_negative_int, port_number, positive_int
+
+HOST = "127.0.0.1"
+PORT = 8050
+CACHE_SIZE = 10_000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+class DegreesServer():
+    """
+    HTTP/JSON server answering degrees of separation queries on localhost.
+    The searches run in a pool of worker processes so that the event loop
+    stays responsive, and recent answers are kept in an LRU cache.
+    """
+
+    def __init__(self, directory, workers=None, cache_size=CACHE_SIZE):
+        if "fork" in multiprocessing.get_all_start_methods():
+            # Workers share the data already loaded, see batch.run_batch_parallel
+            gc.freeze()
+            self.executor = ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("fork"))
+        else:
+            self.executor = ProcessPoolExecutor(
+                workers, initializer=degrees.load_data, initargs=(directory,))
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+
+    async def handle(self, reader, writer):
+        """
+        Serves the requests of one connection, keeping it open between
+        requests unless the client asks to close it.
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = await read_headers(reader)
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, response = await self.respond(request_line, body)
+                data = json.dumps(response).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, request_line, body):
+        """
+        Returns the (status, JSON response) for a request. Queries are
+        GET /path?source=...&target=... or POST /path with a JSON object
+        holding the source and target, as person IDs or names.
+        """
+        try:
+            method, target, _ = request_line.decode("latin-1").split()
+        except ValueError:
+            return 400, {"error": "Malformed request line"}
+        url = urlsplit(target)
+        if url.path != "/path":
+            return 404, {"error": f"Unknown path: {url.path}"}
+
+        if method == "GET":
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        elif method == "POST":
+            try:
+                query = json.loads(body)
+            except ValueError:
+                return 400, {"error": "Body is not valid JSON"}
+        else:
+            return 405, {"error": f"Unsupported method: {method}"}
+        if not isinstance(query, dict) or "source" not in query or "target" not in query:
+            return 400, {"error": "Expected a source and a target"}
+
+        people = []
+        for text in (str(query["source"]), str(query["target"])):
+            person_id = resolve_person(text)
+            if person_id is None:
+                return 404, {"error": f"Person not found or ambiguous: {text}"}
+            people.append(person_id)
+        return 200, await self.shortest_path(*people)
+
+    async def shortest_path(self, source, target):
+        """
+        Returns the result for a query, from the cache or from a worker.
+        """
+        key = (source, target)
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(
+            self.executor, degrees.shortest_path_bidirectional, source, target)
+        result = {
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": path,
+        }
+
+        self.cache[key] = result
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return result
+
+    def close(self):
+        self.executor.shutdown()
+
+
+async def read_headers(reader):
+    """
+    Reads the headers of a request, returning them with lowercase names.
+    """
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            return headers
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def serve(directory, port, workers, cache_size):
+    server = DegreesServer(directory, workers, cache_size)
+    listener = await asyncio.start_server(server.handle, HOST, port)
+    print(f"Serving on http://{HOST}:{port}/path")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serves degrees queries over HTTP.")
+    parser.add_argument("--port", type=port_number, default=PORT)
+    parser.add_argument("--workers", type=positive_int,
+                        help="worker processes answering queries (default: in the server)")
+    parser.add_argument("--cache", type=non_negative_int, default=CACHE_SIZE,
+                        help="number of cached answers")
+    parser.add_argument("directory")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    degrees.load_data(args.directory)
+    print("Data loaded.")
+
+    try:
+        asyncio.run(serve(args.directory, args.port, args.workers, args.cache))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
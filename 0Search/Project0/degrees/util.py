@@ -1,3 +1,13 @@
+import argparse
+import heapq
+import itertools
+import time
+import tracemalloc
+
+from collections import deque
+from contextlib import contextmanager
+
+
 class Node():
     # in this case, each node is a person
     def __init__(self, state, parent, action):
@@ -7,14 +17,18 @@ class Node():
 
 
 class StackFrontier():
+    # the nodes are kept in a deque, so both ends can be popped in O(1),
+    # and the states are counted in a dict, so contains_state is O(1) too
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -23,10 +37,17 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard_state(node.state)
             return node
 
+    def discard_state(self, state):
+        # forget the state once no node in the frontier holds it anymore
+        if self.states[state] == 1:
+            del self.states[state]
+        else:
+            self.states[state] -= 1
+
 
 class QueueFrontier(StackFrontier):
 
@@ -34,6 +55,95 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard_state(node.state)
+            return node
+
+
+class PriorityFrontier(StackFrontier):
+    # removes the node with the lowest key(node) first,
+    # ties are broken by insertion order
+    def __init__(self, key):
+        super().__init__()
+        self.frontier = []
+        self.key = key
+        self.counter = itertools.count()
+
+    def add(self, node):
+        heapq.heappush(self.frontier, (self.key(node), next(self.counter), node))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            _, _, node = heapq.heappop(self.frontier)
+            self.discard_state(node.state)
             return node
+
+
+class SearchStats():
+    # counters filled in by the searches that are given a stats object,
+    # plus the wall time and peak memory measured around them
+    def __init__(self, trace_memory=False):
+        self.nodes_expanded = 0
+        self.frontier_peak = 0
+        self.neighbor_calls = 0
+        self.wall_time = 0.0
+        self.peak_memory = None
+        self.trace_memory = trace_memory
+
+    def expand(self, frontier_size):
+        # called every time a node is taken out of a frontier of that size
+        self.nodes_expanded += 1
+        if frontier_size > self.frontier_peak:
+            self.frontier_peak = frontier_size
+
+    @contextmanager
+    def measure(self):
+        # adds the time spent in the block to wall_time and, when tracing
+        # memory, keeps the highest peak of memory allocated in the block
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.wall_time += time.perf_counter() - start
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.peak_memory = max(peak, self.peak_memory or 0)
+
+    def as_dict(self):
+        return {
+            "nodes_expanded": self.nodes_expanded,
+            "frontier_peak": self.frontier_peak,
+            "neighbor_calls": self.neighbor_calls,
+            "wall_time": self.wall_time,
+            "peak_memory": self.peak_memory,
+        }
+
+
+def positive_int(text):
+    # argparse type of the options that count something, such as workers
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, not {text}")
+    return value
+
+
+def non_negative_int(text):
+    # argparse type of the options that may also be zero, such as cache sizes
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must be zero or more, not {text}")
+    return value
+
+
+def port_number(text):
+    # argparse type of the TCP port options
+    value = int(text)
+    if not 0 < value < 65536:
+        raise argparse.ArgumentTypeError(f"must be a port between 1 and 65535, not {text}")
+    return value
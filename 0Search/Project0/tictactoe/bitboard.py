@@ -0,0 +1,211 @@
+"""
+Tic Tac Toe Player on bitboards
+"""
+
+import math
+import sys
+import time
+
+import tictactoe as ttt
+
+from tictactoe import X, O, EMPTY
+
+# Cell (i, j) of the board is bit 3 * i + j of a bitboard
+FULL = 0b111111111
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # columns
+    0b100010001, 0b001010100,               # diagonals
+]
+
+# For every bitboard of a player, whether it holds a whole line,
+# and for every bitboard of occupied cells, the bits still empty
+WINS = [any(bits & mask == mask for mask in WIN_MASKS) for bits in range(FULL + 1)]
+EMPTY_CELLS = [tuple(cell for cell in range(9) if not occupied >> cell & 1)
+               for occupied in range(FULL + 1)]
+
+# Number of boards visited by max_value_alpha and min_value_alpha
+nodes_searched = 0
+
+
+class Bitboard():
+    """
+    Board stored as one 9-bit int per player, changed in place
+    by making and unmaking moves.
+    """
+
+    def __init__(self, x=0, o=0):
+        self.x = x
+        self.o = o
+        self.moves = bin(x).count("1") + bin(o).count("1")
+
+    def player(self):
+        """
+        Returns player who has the next turn on the board.
+        """
+        return X if self.moves % 2 == 0 else O
+
+    def actions(self):
+        """
+        Returns the empty cells, as bit indices.
+        """
+        return EMPTY_CELLS[self.x | self.o]
+
+    def make(self, cell):
+        """
+        Marks a cell, given as a bit index, for the player with the turn.
+        """
+        if self.moves % 2 == 0:
+            self.x |= 1 << cell
+        else:
+            self.o |= 1 << cell
+        self.moves += 1
+
+    def unmake(self, cell):
+        """
+        Takes back the last move, made on cell.
+        """
+        self.moves -= 1
+        if self.moves % 2 == 0:
+            self.x &= ~(1 << cell)
+        else:
+            self.o &= ~(1 << cell)
+
+    def winner(self):
+        """
+        Returns the winner of the game, if there is one.
+        """
+        if WINS[self.x]:
+            return X
+        if WINS[self.o]:
+            return O
+        return None
+
+    def terminal(self):
+        """
+        Returns True if game is over, False otherwise.
+        """
+        return self.moves == 9 or WINS[self.x] or WINS[self.o]
+
+    def utility(self):
+        """
+        Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+        """
+        if WINS[self.x]:
+            return 1
+        if WINS[self.o]:
+            return -1
+        return 0
+
+    def to_board(self):
+        """
+        Returns the board as the lists of rows used by tictactoe.
+        """
+        return [[X if self.x >> (3 * i + j) & 1 else O if self.o >> (3 * i + j) & 1 else EMPTY
+                 for j in range(3)]
+                for i in range(3)]
+
+
+def from_board(board):
+    """
+    Returns the Bitboard of a board given as lists of rows.
+    """
+    x = o = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x |= 1 << (3 * i + j)
+            elif cell == O:
+                o |= 1 << (3 * i + j)
+    return Bitboard(x, o)
+
+
+def max_value_alpha(state, prev_min):
+    """
+    Returns maximum possible value
+    Choose the action leading to a higher result
+    """
+    global nodes_searched
+    nodes_searched += 1
+    if state.terminal():
+        return state.utility()
+    v = -math.inf
+    for cell in state.actions():
+        state.make(cell)
+        v = max(v, min_value_alpha(state, v))
+        state.unmake(cell)
+        if v > prev_min: # stop looking for more options, they won't be better
+            return v
+    return v
+
+
+def min_value_alpha(state, prev_max):
+    """
+    Returns minimum possible value
+    Choose the action leading to a lower result
+    """
+    global nodes_searched
+    nodes_searched += 1
+    if state.terminal():
+        return state.utility()
+    v = math.inf
+    for cell in state.actions():
+        state.make(cell)
+        v = min(v, max_value_alpha(state, v))
+        state.unmake(cell)
+        if v < prev_max: # stop looking for more options, they won't be better
+            return v
+    return v
+
+
+def minimax(board):
+    """
+    Returns the optimal action (i, j) for the current player on a board
+    given as lists of rows, like tictactoe.minimax.
+    """
+    state = from_board(board)
+    if state.terminal():
+        return None
+
+    best_cell = None
+    if state.player() == X:
+        v = -math.inf
+        for cell in state.actions():
+            state.make(cell)
+            action_result = min_value_alpha(state, v)
+            state.unmake(cell)
+            if action_result > v:
+                v = action_result
+                best_cell = cell
+    else:
+        v = math.inf
+        for cell in state.actions():
+            state.make(cell)
+            action_result = max_value_alpha(state, v)
+            state.unmake(cell)
+            if action_result < v:
+                v = action_result
+                best_cell = cell
+
+    return divmod(best_cell, 3)
+
+
+def benchmark(module):
+    """
+    Returns the nodes searched, seconds taken and nodes per second
+    of the minimax of module from the empty board.
+    """
+    start_nodes = module.nodes_searched
+    start = time.perf_counter()
+    module.minimax(ttt.initial_state())
+    seconds = time.perf_counter() - start
+    nodes = module.nodes_searched - start_nodes
+    return nodes, seconds, nodes / seconds
+
+
+if __name__ == "__main__":
+    # tictactoe starts without any cached positions
+    ttt.transpositions.clear()
+    for name, module in (("tictactoe", ttt), ("bitboard", sys.modules[__name__])):
+        nodes, seconds, rate = benchmark(module)
+        print(f"{name}: {nodes} nodes in {seconds:.3f}s, {rate:,.0f} nodes/sec")
@@ -0,0 +1,141 @@
+"""
+Tic Tac Toe Player from a table of every reachable position
+"""
+
+import os
+import time
+
+from array import array
+
+import tictactoe as ttt
+
+from bitboard import Bitboard, from_board
+
+# Book of every reachable position where the game is not over, as
+# sorted records holding, from the highest bits to the lowest,
+# the bitboards of O and X, the value of the position plus one
+# and the bit index of the best move
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+BOOK_VERSION = 1
+
+# Maps every position (x, o) to its (value, cell), loaded at first use
+book = None
+
+
+def solve(state, scores, moves):
+    """
+    Returns the score of a Bitboard for X, filling scores and moves for
+    it and every position after it. Wins score more the sooner they come,
+    so that the best moves do not put off a win they could take now.
+    """
+    key = (state.x, state.o)
+    if key in scores:
+        return scores[key]
+    if state.terminal():
+        scores[key] = state.utility() * (10 - state.moves)
+        return scores[key]
+
+    results = []
+    for cell in state.actions():
+        state.make(cell)
+        results.append((solve(state, scores, moves), cell))
+        state.unmake(cell)
+    score, cell = max(results) if state.player() == ttt.X else min(results)
+    scores[key] = score
+    moves[key] = cell
+    return score
+
+
+def generate(filename=BOOK_FILE):
+    """
+    Solves the whole game and returns the book, writing it to filename.
+    Failing to write it (e.g. in a read-only directory) is not an error.
+    """
+    scores = {}
+    moves = {}
+    solve(Bitboard(), scores, moves)
+
+    positions = {}
+    records = array("I", [BOOK_VERSION])
+    for (x, o), cell in sorted(moves.items()):
+        value = (scores[(x, o)] > 0) - (scores[(x, o)] < 0)
+        positions[(x, o)] = (value, cell)
+        records.append(o << 15 | x << 6 | (value + 1) << 4 | cell)
+    try:
+        with open(filename + ".tmp", "wb") as f:
+            records.tofile(f)
+        os.replace(filename + ".tmp", filename)
+    except OSError:
+        pass
+    return positions
+
+
+def load(filename=BOOK_FILE):
+    """
+    Returns the book in filename, generating it first if it is missing
+    or was written by another version of this module.
+    """
+    records = array("I")
+    try:
+        with open(filename, "rb") as f:
+            records.frombytes(f.read())
+    except (OSError, ValueError):
+        pass
+    if not records or records[0] != BOOK_VERSION:
+        return generate(filename)
+    return {(record >> 6 & 0x1FF, record >> 15): ((record >> 4 & 3) - 1, record & 0xF)
+            for record in records[1:]}
+
+
+def value(board):
+    """
+    Returns 1 if X wins the game on a board with perfect play,
+    -1 if O wins and 0 for a draw.
+    """
+    state = from_board(board)
+    if state.terminal():
+        return state.utility()
+    return lookup(state)[0]
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board,
+    looked up in the book.
+    """
+    state = from_board(board)
+    if state.terminal():
+        return None
+    return divmod(lookup(state)[1], 3)
+
+
+def lookup(state):
+    """
+    Returns the (value, cell) of a Bitboard, loading the book if needed.
+    """
+    global book
+    if book is None:
+        book = load()
+    return book[(state.x, state.o)]
+
+
+if __name__ == "__main__":
+    # Rebuild the book, then time a lookup of every position in it
+    start = time.perf_counter()
+    generate()
+    seconds = time.perf_counter() - start
+    if os.path.exists(BOOK_FILE):
+        print(f"Generated {BOOK_FILE} in {seconds:.3f}s, {os.path.getsize(BOOK_FILE)} bytes")
+    else:
+        print(f"Generated the book in {seconds:.3f}s, could not write {BOOK_FILE}")
+
+    start = time.perf_counter()
+    book = load()
+    print(f"Loaded {len(book)} positions in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    boards = [Bitboard(x, o).to_board() for x, o in book]
+    start = time.perf_counter()
+    for board in boards:
+        minimax(board)
+    seconds = time.perf_counter() - start
+    print(f"{seconds / len(boards) * 1e6:.1f} microseconds per move")
@@ -0,0 +1,85 @@
+"""
+Tic Tac Toe Player with Monte Carlo tree search
+"""
+
+import math
+import random
+
+from bitboard import Bitboard, from_board
+
+# Playouts per move, and weight of exploring little visited moves
+ITERATIONS = 1000
+EXPLORATION = math.sqrt(2)
+
+# Number of playouts run by minimax
+nodes_searched = 0
+
+
+class TreeNode():
+    def __init__(self, parent, cell, mover, actions):
+        self.parent = parent
+        self.cell = cell
+        self.mover = mover
+        self.untried = list(actions)
+        self.children = []
+        self.visits = 0
+        self.wins = 0.0
+
+    def select(self):
+        """
+        Returns the child with the highest upper confidence bound (UCT).
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: (
+            child.wins / child.visits + EXPLORATION * math.sqrt(log_visits / child.visits)
+        ))
+
+
+def minimax(board, iterations=ITERATIONS, generator=random):
+    """
+    Returns the action for the current player on the board that was
+    visited the most by a Monte Carlo tree search of iterations random
+    playouts. Not always optimal, but it gets better with more playouts.
+    """
+    global nodes_searched
+    start = from_board(board)
+    if start.terminal():
+        return None
+
+    # The mover of the root is the player who moved last
+    root = TreeNode(None, None, None, start.actions())
+    for _ in range(iterations):
+        nodes_searched += 1
+        node = root
+        state = Bitboard(start.x, start.o)
+
+        # Go down the tree through fully expanded nodes
+        while not node.untried and node.children:
+            node = node.select()
+            state.make(node.cell)
+
+        # Add one untried move to the tree
+        if node.untried:
+            cell = node.untried.pop(generator.randrange(len(node.untried)))
+            mover = state.player()
+            state.make(cell)
+            child = TreeNode(node, cell, mover, () if state.terminal() else state.actions())
+            node.children.append(child)
+            node = child
+
+        # Play randomly until the game is over
+        while not state.terminal():
+            state.make(generator.choice(state.actions()))
+
+        # Count the result for the player who made the move into every node
+        winner = state.winner()
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.mover:
+                node.wins += 1
+            node = node.parent
+
+    best = max(root.children, key=lambda child: child.visits)
+    return divmod(best.cell, 3)
@@ -0,0 +1,281 @@
+"""
+m,n,k-game Player: k in a row on a board of m rows and n columns
+"""
+
+import sys
+import time
+
+from tictactoe import X, O, EMPTY
+
+# Score of a won position, less the number of moves it takes,
+# so that faster wins and slower losses are preferred
+WIN = 1_000_000
+
+# Score of the open lines holding a given number of marks of a player,
+# for the default evaluation heuristic
+LINE_WEIGHTS = [0, 1, 8, 64, 512, 4096, 32768]
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class Game():
+    """
+    Rules of an m,n,k-game. Positions are two bitboards, one per player,
+    where cell (i, j) is bit i * (n + 1) + j, so that the bits past the
+    end of every row stay empty and lines never wrap around the board.
+    """
+
+    def __init__(self, m=3, n=3, k=3):
+        if not 1 <= k <= max(m, n):
+            raise ValueError("k must fit in the board")
+        self.m = m
+        self.n = n
+        self.k = k
+        self.stride = n + 1
+        self.cells = [i * self.stride + j for i in range(m) for j in range(n)]
+        self.board_mask = sum(1 << cell for cell in self.cells)
+
+        # Steps to the next cell of a line: right, down, down-left, down-right
+        self.directions = (1, self.stride, self.stride - 1, self.stride + 1)
+
+        # Every line of k cells, as a mask
+        self.lines = []
+        for cell in self.cells:
+            i, j = divmod(cell, self.stride)
+            for di, dj in ((0, 1), (1, 0), (1, -1), (1, 1)):
+                if 0 <= i + (k - 1) * di < m and 0 <= j + (k - 1) * dj < n:
+                    self.lines.append(sum(1 << (cell + s * (di * self.stride + dj))
+                                          for s in range(k)))
+
+    def from_board(self, board):
+        """
+        Returns the (x, o) bitboards of a board given as lists of rows.
+        """
+        x = o = 0
+        for i, row in enumerate(board):
+            for j, cell in enumerate(row):
+                if cell == X:
+                    x |= 1 << (i * self.stride + j)
+                elif cell == O:
+                    o |= 1 << (i * self.stride + j)
+        return x, o
+
+    def action(self, cell):
+        """
+        Returns the (i, j) action of a bit index.
+        """
+        return divmod(cell, self.stride)
+
+    def has_line(self, bits):
+        """
+        Returns True if the bitboard of a player holds k in a row.
+        """
+        for step in self.directions:
+            line = bits
+            for _ in range(self.k - 1):
+                line &= line >> step
+                if not line:
+                    break
+            if line:
+                return True
+        return False
+
+    def moves(self, x, o):
+        """
+        Returns the empty cells worth playing, as bit indices: on boards
+        larger than 4x4, only the ones next to a mark if there are any
+        (or the center, on an empty board), since far away cells are
+        rarely better.
+        """
+        occupied = x | o
+        empty = self.board_mask & ~occupied
+        if self.m * self.n > 16:
+            if not occupied:
+                return [(self.m // 2) * self.stride + self.n // 2]
+            near = occupied
+            for step in self.directions:
+                near |= occupied << step | occupied >> step
+            if empty & near:
+                empty &= near
+        return [cell for cell in self.cells if empty >> cell & 1]
+
+
+def line_heuristic(game, me, opp):
+    """
+    Scores a position for the player to move: every line still open to a
+    single player counts for that player, more the more marks it holds.
+    """
+    score = 0
+    for line in game.lines:
+        mine = me & line
+        theirs = opp & line
+        if mine and not theirs:
+            score += LINE_WEIGHTS[min(bin(mine).count("1"), len(LINE_WEIGHTS) - 1)]
+        elif theirs and not mine:
+            score -= LINE_WEIGHTS[min(bin(theirs).count("1"), len(LINE_WEIGHTS) - 1)]
+    return score
+
+
+class Engine():
+    """
+    Iterative deepening alpha-beta (negamax) search for a Game, with
+    killer moves and the history heuristic to order moves, a pluggable
+    evaluation heuristic for the positions at the depth limit, and an
+    optional time budget in seconds per move.
+    """
+
+    def __init__(self, game, heuristic=line_heuristic, time_budget=None, max_depth=None):
+        self.game = game
+        self.heuristic = heuristic
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.nodes_searched = 0
+
+    def best_action(self, board):
+        """
+        Returns the best action (i, j) found for the player to move on a
+        board given as lists of rows, or None if the game is over.
+        """
+        game = self.game
+        x, o = game.from_board(board)
+        if game.has_line(x) or game.has_line(o) or not game.moves(x, o):
+            return None
+        if bin(x).count("1") > bin(o).count("1"):
+            me, opp = o, x
+        else:
+            me, opp = x, o
+
+        empty = bin(game.board_mask & ~(x | o)).count("1")
+        max_depth = empty if self.max_depth is None else min(self.max_depth, empty)
+        self.deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        self.killers = [[] for _ in range(empty + 1)]
+        self.history = {}
+
+        # Search deeper and deeper, keeping the best move of the last
+        # search that finished, until the time or the depth run out
+        best_cell = game.moves(x, o)[0]
+        for depth in range(1, max_depth + 1):
+            try:
+                score, cell = self.search_root(me, opp, depth, best_cell)
+            except SearchTimeout:
+                break
+            best_cell = cell
+            if abs(score) >= WIN - empty:
+                break
+        return game.action(best_cell)
+
+    def search_root(self, me, opp, depth, first):
+        """
+        Returns the score and best cell of a search to a given depth,
+        trying first the best cell of the previous search.
+        """
+        moves = self.order(self.game.moves(me, opp), 0)
+        moves.remove(first)
+        moves.insert(0, first)
+        alpha, beta = -WIN - 1, WIN + 1
+        best_cell = first
+        for cell in moves:
+            score = -self.negamax(opp, me | 1 << cell, depth - 1, -beta, -alpha, 1)
+            if score > alpha:
+                alpha = score
+                best_cell = cell
+        return alpha, best_cell
+
+    def negamax(self, me, opp, depth, alpha, beta, ply):
+        """
+        Returns the score of a position for the player to move (me),
+        searching depth moves ahead within the (alpha, beta) window.
+        """
+        self.nodes_searched += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout
+
+        game = self.game
+        if game.has_line(opp):
+            return -(WIN - ply)
+        moves = game.moves(me, opp)
+        if not moves:
+            return 0
+        if depth == 0:
+            return self.heuristic(game, me, opp)
+
+        best = -WIN - 1
+        for cell in self.order(moves, ply):
+            score = -self.negamax(opp, me | 1 << cell, depth - 1, -beta, -alpha, ply + 1)
+            if score > best:
+                best = score
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                # Remember the move that caused the cutoff
+                killers = self.killers[ply]
+                if cell not in killers:
+                    killers.insert(0, cell)
+                    del killers[2:]
+                self.history[cell] = self.history.get(cell, 0) + depth * depth
+                break
+        return best
+
+    def order(self, moves, ply):
+        """
+        Returns the moves sorted with the killer moves of a ply first,
+        then by how often they caused a cutoff anywhere.
+        """
+        killers = self.killers[ply] if ply < len(self.killers) else []
+        return sorted(moves, key=lambda cell: (cell not in killers, -self.history.get(cell, 0)))
+
+
+# Engines for each (m, n, k), so that their lines are only computed once
+engines = {}
+
+
+def minimax(board, k=3, time_budget=None, max_depth=None):
+    """
+    Returns the optimal action for the current player on a board,
+    like tictactoe.minimax, for a board of any size and k in a row.
+    Without a time budget or depth limit, the search is exhaustive.
+    """
+    m, n = len(board), len(board[0])
+    if (m, n, k) not in engines:
+        engines[(m, n, k)] = Engine(Game(m, n, k))
+    engine = engines[(m, n, k)]
+    engine.time_budget = time_budget
+    engine.max_depth = max_depth
+    return engine.best_action(board)
+
+
+USAGE = "Usage: python mnk.py m n k [seconds per move]"
+
+
+def main():
+    # Plays a game of the engine against itself and prints every move
+    if len(sys.argv) not in (4, 5):
+        sys.exit(USAGE)
+    try:
+        m, n, k = (int(arg) for arg in sys.argv[1:4])
+        budget = float(sys.argv[4]) if len(sys.argv) == 5 else 1.0
+    except ValueError:
+        sys.exit(USAGE)
+
+    game = Game(m, n, k)
+    engine = Engine(game, time_budget=budget)
+    board = [[EMPTY] * n for _ in range(m)]
+    player = X
+    while True:
+        action = engine.best_action(board)
+        if action is None:
+            break
+        board[action[0]][action[1]] = player
+        print(f"{player} plays {action}, {engine.nodes_searched} nodes searched so far")
+        player = O if player == X else X
+
+    for row in board:
+        print("".join(cell or "." for cell in row))
+    x, o = game.from_board(board)
+    print("Winner:", X if game.has_line(x) else O if game.has_line(o) else None)
+
+
+if __name__ == "__main__":
+    main()
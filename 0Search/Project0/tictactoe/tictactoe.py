@@ -11,6 +11,32 @@ X = "X"
 O = "O"
 EMPTY = None
 
+# Transposition table shared by every search in the session that is not
+# given its own, mapping the canonical key of a board to its value and
+# whether that value is exact or only a lower or upper bound, from a
+# search that stopped early
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
+transpositions = {}
+
+# Number of boards visited by max_value_alpha and min_value_alpha
+nodes_searched = 0
+
+# Order in which each of the 8 symmetries of the board (rotations and
+# reflections) reads the cells, numbered row by row
+SYMMETRIES = [
+    (0, 1, 2, 3, 4, 5, 6, 7, 8),
+    (6, 3, 0, 7, 4, 1, 8, 5, 2),
+    (8, 7, 6, 5, 4, 3, 2, 1, 0),
+    (2, 5, 8, 1, 4, 7, 0, 3, 6),
+    (2, 1, 0, 5, 4, 3, 8, 7, 6),
+    (6, 7, 8, 3, 4, 5, 0, 1, 2),
+    (0, 3, 6, 1, 4, 7, 2, 5, 8),
+    (8, 5, 2, 7, 4, 1, 6, 3, 0),
+]
+CELL_KEYS = {X: "X", O: "O", EMPTY: "."}
+
 
 def initial_state():
     """
@@ -148,40 +174,82 @@ def utility(board):
 
 
 
-def max_value_alpha(board, prev_min):
+def canonical_key(board):
+    """
+    Returns the key of a board in the transposition table,
+    the same for all the boards that are rotations or reflections of it.
+    """
+    cells = [CELL_KEYS[cell] for row in board for cell in row]
+    return min("".join(cells[i] for i in symmetry) for symmetry in SYMMETRIES)
+
+
+def max_value_alpha(board, prev_min, table=transpositions):
     """
     Returns maximum possible value
     Choose the action leading to a higher result
+    Boards searched are cached in table, or not at all if it is None
     """
+    global nodes_searched
+    nodes_searched += 1
     if terminal(board):
         return utility(board)
+
+    # a lower bound is enough if it is already above prev_min
+    if table is not None:
+        key = canonical_key(board)
+        if key in table:
+            value, bound = table[key]
+            if bound == EXACT or (bound == LOWER and value > prev_min):
+                return value
+
     v = -math.inf
     for action in actions(board):
-        v = max(v, min_value_alpha(result(board, action), v))
+        v = max(v, min_value_alpha(result(board, action), v, table))
         if v > prev_min: # stop looking for more options, they won't be better
+            if table is not None:
+                table[key] = (v, LOWER)
             return v
+    if table is not None:
+        table[key] = (v, EXACT)
     return v
 
 
-def min_value_alpha(board, prev_max):
+def min_value_alpha(board, prev_max, table=transpositions):
     """
     Returns minimum possible value
     Choose the action leading to a lower result
+    Boards searched are cached in table, or not at all if it is None
     """
+    global nodes_searched
+    nodes_searched += 1
     if terminal(board):
         return utility(board)
+
+    # an upper bound is enough if it is already below prev_max
+    if table is not None:
+        key = canonical_key(board)
+        if key in table:
+            value, bound = table[key]
+            if bound == EXACT or (bound == UPPER and value < prev_max):
+                return value
+
     v = math.inf
     for action in actions(board):
-        v = min(v, max_value_alpha(result(board, action), v))
+        v = min(v, max_value_alpha(result(board, action), v, table))
         if v < prev_max: # stop looking for more options, they won't be better
+            if table is not None:
+                table[key] = (v, UPPER)
             return v
+    if table is not None:
+        table[key] = (v, EXACT)
     return v
 
 
 
-def minimax(board):
+def minimax(board, table=transpositions):
     """
     Returns the optimal action for the current player on the board.
+    Searched boards are cached in table, or not at all if it is None.
     """
     if terminal(board):
         return None
@@ -193,7 +261,7 @@ def minimax(board):
         v = -math.inf
         best_action = None
         for action in actions(playing_board):
-            action_result = min_value_alpha(result(playing_board, action), v)
+            action_result = min_value_alpha(result(playing_board, action), v, table)
             if action_result > v:
                 v = action_result
                 best_action = action
@@ -202,7 +270,7 @@ def minimax(board):
         v = math.inf
         best_action = None
         for action in actions(playing_board):
-            action_result = max_value_alpha(result(playing_board, action), v)
+            action_result = max_value_alpha(result(playing_board, action), v, table)
             if action_result < v:
                 v = action_result
                 best_action = action
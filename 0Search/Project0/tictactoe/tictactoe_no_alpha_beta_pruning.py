@@ -10,6 +10,9 @@ X = "X"
 O = "O"
 EMPTY = None
 
+# Number of boards visited by max_value and min_value
+nodes_searched = 0
+
 
 def initial_state():
     """
@@ -153,6 +156,8 @@ def max_value(board):
     Returns maximum possible value
     Choose the action leading to a higher result
     """
+    global nodes_searched
+    nodes_searched += 1
     if terminal(board):
         return utility(board)
     v = -math.inf
@@ -166,6 +171,8 @@ def min_value(board):
     Returns minimum possible value
     Choose the action leading to a lower result
     """
+    global nodes_searched
+    nodes_searched += 1
     if terminal(board):
         return utility(board)
     v = math.inf
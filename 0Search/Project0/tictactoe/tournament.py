@@ -0,0 +1,178 @@
+"""
+Tic Tac Toe tournament between engines, without the pygame runner
+"""
+
+import argparse
+import itertools
+import multiprocessing
+import random
+import time
+
+import bitboard
+import book
+import mcts
+import mnk
+import tictactoe as ttt
+import tictactoe_no_alpha_beta_pruning as unpruned
+
+
+# Transposition table of the transposition engine, kept apart from the one
+# of tictactoe that runner.py uses, and emptied before every game
+transpositions = {}
+
+
+def pruned_move(board, generator):
+    # Search without a transposition table, to measure alpha-beta pruning on its own
+    return ttt.minimax(board, table=None)
+
+
+def transposition_move(board, generator):
+    return ttt.minimax(board, table=transpositions)
+
+
+def random_move(board, generator):
+    return generator.choice(sorted(ttt.actions(board)))
+
+
+# Every engine, as its move function and a function that
+# returns the number of nodes it has searched so far
+ENGINES = {
+    "pruned": (pruned_move, lambda: ttt.nodes_searched),
+    "unpruned": (lambda board, generator: unpruned.minimax(board), lambda: unpruned.nodes_searched),
+    "transposition": (transposition_move, lambda: ttt.nodes_searched),
+    "bitboard": (lambda board, generator: bitboard.minimax(board), lambda: bitboard.nodes_searched),
+    "mnk": (lambda board, generator: mnk.minimax(board),
+            lambda: sum(engine.nodes_searched for engine in mnk.engines.values())),
+    "book": (lambda board, generator: book.minimax(board), lambda: 0),
+    "mcts": (lambda board, generator: mcts.minimax(board, generator=generator), lambda: mcts.nodes_searched),
+    "random": (random_move, lambda: 0),
+}
+
+GAMES = 2
+SEED = 0
+
+
+def positive_int(text):
+    """
+    argparse type of the options that count something.
+    """
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, not {text}")
+    return value
+
+
+def play_game(game):
+    """
+    Plays one game between two engines, given as (x_engine, o_engine, seed),
+    and returns its winner and the nodes searched, number of moves,
+    total and longest move time of each engine.
+    """
+    names = {ttt.X: game[0], ttt.O: game[1]}
+    generator = random.Random(game[2])
+
+    # Start every game from an empty table, so that its stats do not depend
+    # on which games the same worker happened to play before
+    transpositions.clear()
+    stats = {player: {"nodes": 0, "moves": 0, "time": 0.0, "longest": 0.0} for player in names}
+
+    board = ttt.initial_state()
+    while not ttt.terminal(board):
+        player = ttt.player(board)
+        move, nodes = ENGINES[names[player]]
+        start_nodes = nodes()
+        start = time.perf_counter()
+        action = move(board, generator)
+        seconds = time.perf_counter() - start
+
+        stats[player]["nodes"] += nodes() - start_nodes
+        stats[player]["moves"] += 1
+        stats[player]["time"] += seconds
+        stats[player]["longest"] = max(stats[player]["longest"], seconds)
+        board = ttt.result(board, action)
+
+    return {"x": names[ttt.X], "o": names[ttt.O], "winner": ttt.winner(board),
+            "stats": stats}
+
+
+def run_tournament(engines, games, workers=None):
+    """
+    Plays every engine against every other one, games times with each
+    side starting, in parallel worker processes, and returns the results.
+    """
+    schedule = [(x, o, SEED + i)
+                for x, o in itertools.permutations(engines, 2)
+                for i in range(games)]
+    with multiprocessing.Pool(workers) as pool:
+        return pool.map(play_game, schedule, chunksize=1)
+
+
+def summary(results, engines):
+    """
+    Returns the lines of a table with the wins, draws and losses, nodes
+    searched and move times of every engine over all its games.
+    """
+    rows = {name: {"games": 0, "wins": 0, "draws": 0, "losses": 0,
+                   "nodes": 0, "moves": 0, "time": 0.0, "longest": 0.0}
+            for name in engines}
+    for result in results:
+        for player, name in ((ttt.X, result["x"]), (ttt.O, result["o"])):
+            row = rows[name]
+            row["games"] += 1
+            if result["winner"] is None:
+                row["draws"] += 1
+            elif result["winner"] == player:
+                row["wins"] += 1
+            else:
+                row["losses"] += 1
+            stats = result["stats"][player]
+            row["nodes"] += stats["nodes"]
+            row["moves"] += stats["moves"]
+            row["time"] += stats["time"]
+            row["longest"] = max(row["longest"], stats["longest"])
+
+    lines = [f"{'engine':<14}{'games':>6}{'wins':>6}{'draws':>6}{'losses':>7}"
+             f"{'nodes/move':>12}{'ms/move':>10}{'max ms':>10}{'total s':>9}"]
+    for name, row in rows.items():
+        moves = max(row["moves"], 1)
+        lines.append(
+            f"{name:<14}{row['games']:>6}{row['wins']:>6}{row['draws']:>6}{row['losses']:>7}"
+            f"{row['nodes'] / moves:>12.0f}{row['time'] / moves * 1000:>10.2f}"
+            f"{row['longest'] * 1000:>10.2f}{row['time']:>9.2f}"
+        )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tic Tac Toe tournament between engines.")
+    parser.add_argument("--games", type=positive_int, default=GAMES,
+                        help="games per pairing and side")
+    parser.add_argument("--workers", type=positive_int, help="number of worker processes")
+    parser.add_argument("engines", nargs="*", metavar="engine",
+                        help=f"engines to play (default: {', '.join(ENGINES)})")
+    args = parser.parse_args()
+    for name in args.engines:
+        if name not in ENGINES:
+            parser.error(f"unknown engine {name}, choose from {', '.join(ENGINES)}")
+    engines = args.engines or list(ENGINES)
+    if len(engines) < 2:
+        parser.error("at least two engines are needed")
+
+    start = time.perf_counter()
+    results = run_tournament(engines, args.games, args.workers)
+    seconds = time.perf_counter() - start
+
+    for x, o in itertools.permutations(engines, 2):
+        games = [result for result in results if result["x"] == x and result["o"] == o]
+        x_wins = sum(result["winner"] == ttt.X for result in games)
+        o_wins = sum(result["winner"] == ttt.O for result in games)
+        print(f"{x} (X) vs {o} (O): {x_wins} X wins, "
+              f"{len(games) - x_wins - o_wins} draws, {o_wins} O wins")
+    print()
+    for line in summary(results, engines):
+        print(line)
+    print(f"\n{len(results)} games in {seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
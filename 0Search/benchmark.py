@@ -0,0 +1,137 @@
+import json
+import os
+import random
+import sys
+
+# The searches live in their own project directories
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEGREES = os.path.join(ROOT, "Project0", "degrees")
+MAZES = os.path.join(ROOT, "src0")
+sys.path.insert(0, DEGREES)
+sys.path.insert(0, MAZES)
+
+import degrees
+import landmarks
+import maze
+
+from util import SearchStats
+
+# Fixed queries for the small dataset, every other dataset gets
+# the same random sample of people on every run
+SMALL_QUERIES = [
+    ("102", "193"), ("144", "193"), ("158", "1597"), ("129", "420"),
+    ("705", "596520"), ("398", "197"), ("102", "914612"),
+]
+NUM_QUERIES = 50
+SEED = 0
+
+MAZE_FILES = ["maze1.txt", "maze2.txt", "maze3.txt"]
+
+USAGE = "Usage: python benchmark.py [--memory] [degrees_directory ...]"
+
+
+def main():
+    # "--memory" traces the peak memory of every search, in a separate
+    # run so that tracing does not distort the wall times
+    args = sys.argv[1:]
+    trace_memory = "--memory" in args
+    if trace_memory:
+        args.remove("--memory")
+    if any(arg.startswith("-") for arg in args):
+        sys.exit(USAGE)
+    directories = args or [os.path.join(DEGREES, "small"), os.path.join(DEGREES, "large")]
+
+    results = []
+    for directory in directories:
+        if not os.path.isdir(directory):
+            print(f"Skipping missing directory {directory}", file=sys.stderr)
+            continue
+        results.extend(benchmark_degrees(directory, trace_memory))
+    results.extend(benchmark_mazes(trace_memory))
+
+    json.dump(results, sys.stdout, indent=2)
+    print()
+
+
+def benchmark_degrees(directory, trace_memory):
+    """
+    Returns one result per degrees search algorithm,
+    each answering the same queries on the dataset in directory.
+    """
+    for data in (degrees.names, degrees.people, degrees.movies,
+                 degrees.components, degrees.component_sizes):
+        data.clear()
+    degrees.load_data(directory)
+    queries = degrees_queries(directory)
+
+    algorithms = dict(degrees.SEARCH_ALGORITHMS)
+    algorithms["landmarks"] = landmarks.load_or_build(directory).shortest_path
+
+    results = []
+    for name, search in algorithms.items():
+        stats = run_searches(
+            lambda stats: [search(source, target, stats=stats) for source, target in queries],
+            trace_memory,
+        )
+        results.append(result("degrees", os.path.basename(os.path.normpath(directory)),
+                              name, len(queries), stats))
+    return results
+
+
+def degrees_queries(directory):
+    """
+    Returns the fixed list of (source, target) queries for a dataset.
+    """
+    if os.path.basename(os.path.normpath(directory)) == "small":
+        return SMALL_QUERIES
+    person_ids = sorted(degrees.people)
+    generator = random.Random(SEED)
+    return [tuple(generator.sample(person_ids, 2)) for _ in range(NUM_QUERIES)]
+
+
+def benchmark_mazes(trace_memory):
+    """
+    Returns one result per maze file and Maze.solve algorithm.
+    """
+    results = []
+    for filename in MAZE_FILES:
+        for algorithm in maze.SOLVERS:
+            stats = run_searches(
+                lambda stats: maze.Maze(os.path.join(MAZES, filename)).solve(algorithm, stats),
+                trace_memory,
+            )
+            results.append(result("maze", filename, algorithm, 1, stats))
+    return results
+
+
+def run_searches(run, trace_memory):
+    """
+    Calls run with a stats object and returns the stats, with the peak
+    memory of a second, traced call if trace_memory is True.
+    """
+    stats = SearchStats()
+    with stats.measure():
+        run(stats)
+    if trace_memory:
+        traced = SearchStats(trace_memory=True)
+        with traced.measure():
+            run(traced)
+        stats.peak_memory = traced.peak_memory
+    return stats
+
+
+def result(problem, dataset, algorithm, queries, stats):
+    """
+    Returns a single benchmark result as a dictionary.
+    """
+    return {
+        "problem": problem,
+        "dataset": dataset,
+        "algorithm": algorithm,
+        "queries": queries,
+        **stats.as_dict(),
+    }
+
+
+if __name__ == "__main__":
+    main()
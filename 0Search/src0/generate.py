@@ -0,0 +1,184 @@
+import argparse
+import random
+
+WALL = ord("#")
+OPEN = ord(" ")
+
+
+def backtracker(height, width, seed=None):
+    """
+    Returns the lines of a perfect maze carved with a randomized
+    depth-first search (recursive backtracker), which gives long,
+    winding corridors with few dead ends.
+    """
+    generator = random.Random(seed)
+    grid, rows, cols = carving_grid(height, width)
+
+    # Cells are at odd coordinates, with the walls between them in between
+    visited = bytearray(rows * cols)
+    visited[0] = 1
+    carve(grid, width, 1, 1)
+    stack = [(0, 0)]
+    while stack:
+        row, col = stack[-1]
+        options = [(r, c) for r, c in adjacent_cells(row, col, rows, cols)
+                   if not visited[r * cols + c]]
+        if not options:
+            stack.pop()
+            continue
+        r, c = generator.choice(options)
+        visited[r * cols + c] = 1
+        carve(grid, width, row + r + 1, col + c + 1)
+        carve(grid, width, 2 * r + 1, 2 * c + 1)
+        stack.append((r, c))
+
+    return maze_lines(grid, height, width, (1, 1), (2 * rows - 1, 2 * cols - 1))
+
+
+def prim(height, width, seed=None):
+    """
+    Returns the lines of a perfect maze grown with randomized Prim's
+    algorithm, which gives many short branches and dead ends.
+    """
+    generator = random.Random(seed)
+    grid, rows, cols = carving_grid(height, width)
+
+    # Frontier of (cell, cell of the maze it would be joined to)
+    visited = bytearray(rows * cols)
+    visited[0] = 1
+    carve(grid, width, 1, 1)
+    frontier = [(cell, (0, 0)) for cell in adjacent_cells(0, 0, rows, cols)]
+    while frontier:
+        # Remove a random entry by swapping it with the last one
+        i = generator.randrange(len(frontier))
+        frontier[i], frontier[-1] = frontier[-1], frontier[i]
+        (r, c), (row, col) = frontier.pop()
+        if visited[r * cols + c]:
+            continue
+        visited[r * cols + c] = 1
+        carve(grid, width, row + r + 1, col + c + 1)
+        carve(grid, width, 2 * r + 1, 2 * c + 1)
+        frontier.extend((cell, (r, c)) for cell in adjacent_cells(r, c, rows, cols)
+                        if not visited[cell[0] * cols + cell[1]])
+
+    return maze_lines(grid, height, width, (1, 1), (2 * rows - 1, 2 * cols - 1))
+
+
+def obstacles(height, width, density=0.3, seed=None):
+    """
+    Returns the lines of an open grid where every cell is a wall with
+    probability density, starting and ending at opposite corners.
+    The cells next to the corners are always open, but there may still
+    be no path between them.
+    """
+    if not 0 <= density <= 1:
+        raise ValueError("density must be between 0 and 1")
+    generator = random.Random(seed)
+
+    # Turn random bytes into walls below the threshold
+    threshold = round(density * 256)
+    table = bytes(WALL if byte < threshold else OPEN for byte in range(256))
+    grid = bytearray(generator.randbytes(height * width).translate(table))
+    for i, j in ((0, 1), (1, 0), (height - 1, width - 2), (height - 2, width - 1)):
+        if 0 <= i < height and 0 <= j < width:
+            carve(grid, width, i, j)
+
+    return maze_lines(grid, height, width, (0, 0), (height - 1, width - 1))
+
+
+def carving_grid(height, width):
+    """
+    Returns a grid full of walls, and the number of rows and columns of
+    cells that fit in it at odd coordinates.
+    """
+    rows = (height - 1) // 2
+    cols = (width - 1) // 2
+    if rows < 1 or cols < 1:
+        raise ValueError("maze must be at least 3x3")
+    return bytearray([WALL]) * (height * width), rows, cols
+
+
+def adjacent_cells(row, col, rows, cols):
+    """Returns the cells next to a cell, two steps away in the grid."""
+    cells = []
+    if row > 0:
+        cells.append((row - 1, col))
+    if row < rows - 1:
+        cells.append((row + 1, col))
+    if col > 0:
+        cells.append((row, col - 1))
+    if col < cols - 1:
+        cells.append((row, col + 1))
+    return cells
+
+
+def carve(grid, width, i, j):
+    """Opens the grid at row i, column j."""
+    grid[i * width + j] = OPEN
+
+
+def maze_lines(grid, height, width, start, goal):
+    """
+    Returns the lines of the grid in the maze file format,
+    with the start and goal marked.
+    """
+    grid[start[0] * width + start[1]] = ord("A")
+    grid[goal[0] * width + goal[1]] = ord("B")
+    return [grid[i * width:(i + 1) * width].decode() for i in range(height)]
+
+
+def write_maze(lines, filename):
+    with open(filename, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+GENERATORS = {
+    "backtracker": backtracker,
+    "prim": prim,
+    "obstacles": obstacles,
+}
+
+
+def positive_int(text):
+    """
+    argparse type of the sizes of a maze.
+    """
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, not {text}")
+    return value
+
+
+def fraction(text):
+    """
+    argparse type of the wall density of obstacle grids.
+    """
+    value = float(text)
+    if not 0 <= value <= 1:
+        raise argparse.ArgumentTypeError(f"must be between 0 and 1, not {text}")
+    return value
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generates a maze file.")
+    parser.add_argument("--density", type=fraction, default=0.3,
+                        help="wall density of obstacle grids")
+    parser.add_argument("--seed", type=int, help="random seed, to generate the same maze again")
+    parser.add_argument("generator", choices=GENERATORS)
+    parser.add_argument("height", type=positive_int)
+    parser.add_argument("width", type=positive_int)
+    parser.add_argument("output", help="maze file to write")
+    args = parser.parse_args()
+
+    # Carved mazes have a minimum size, reported like any other bad argument
+    try:
+        if args.generator == "obstacles":
+            lines = obstacles(args.height, args.width, args.density, args.seed)
+        else:
+            lines = GENERATORS[args.generator](args.height, args.width, args.seed)
+    except ValueError as error:
+        parser.error(str(error))
+    write_maze(lines, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,34 @@
+import heapq
+import itertools
+import math
+import re
 import sys
+import time
+import tracemalloc
+
+from array import array
+from collections import deque
+from contextlib import contextmanager
 
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
+        self.cost = cost
 
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,10 +37,16 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard_state(node.state)
             return node
 
+    def discard_state(self, state):
+        if self.states[state] == 1:
+            del self.states[state]
+        else:
+            self.states[state] -= 1
+
 
 class QueueFrontier(StackFrontier):
 
@@ -35,10 +54,93 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard_state(node.state)
             return node
 
+
+class PriorityFrontier(StackFrontier):
+    def __init__(self, key):
+        super().__init__()
+        self.frontier = []
+        self.key = key
+        self.counter = itertools.count()
+
+    def add(self, node):
+        heapq.heappush(self.frontier, (self.key(node), next(self.counter), node))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            _, _, node = heapq.heappop(self.frontier)
+            self.discard_state(node.state)
+            return node
+
+
+class SearchStats():
+    def __init__(self, trace_memory=False):
+        self.nodes_expanded = 0
+        self.frontier_peak = 0
+        self.neighbor_calls = 0
+        self.wall_time = 0.0
+        self.peak_memory = None
+        self.trace_memory = trace_memory
+
+    def expand(self, frontier_size):
+        self.nodes_expanded += 1
+        if frontier_size > self.frontier_peak:
+            self.frontier_peak = frontier_size
+
+    @contextmanager
+    def measure(self):
+        if self.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.wall_time += time.perf_counter() - start
+            if self.trace_memory:
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.peak_memory = max(peak, self.peak_memory or 0)
+
+    def as_dict(self):
+        return {
+            "nodes_expanded": self.nodes_expanded,
+            "frontier_peak": self.frontier_peak,
+            "neighbor_calls": self.neighbor_calls,
+            "wall_time": self.wall_time,
+            "peak_memory": self.peak_memory,
+        }
+
+# Bytes of a maze file line that are open cells, any other byte
+# (including characters outside latin-1) is a wall
+WALLS = bytes(0 if chr(byte) in " AB123456789" else 1 for byte in range(256))
+DIGITS = re.compile("[1-9]")
+
+# Cached jump point of a grid index not known yet, or known to be none
+UNKNOWN_JUMP = -2
+NO_JUMP = -1
+
+# Characters of the walls and open cells of the grid when printed
+TEXT = bytes.maketrans(b"\x00\x01", b" #")
+
+# Palette indices of every kind of cell in images, and their colors
+WALL, EMPTY, EXPLORED, SOLUTION, START, GOAL, BLACK = range(7)
+PALETTE = [
+    40, 40, 40,
+    237, 240, 252,
+    212, 97, 85,
+    220, 235, 113,
+    255, 0, 0,
+    0, 171, 28,
+    0, 0, 0,
+]
+PIXELS = bytes.maketrans(b"\x00\x01", bytes([EMPTY, WALL]))
+
 class Maze():
 
     def __init__(self, filename):
@@ -58,77 +160,158 @@ class Maze():
         self.height = len(contents)
         self.width = max(len(line) for line in contents)
 
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
+        # Keep track of walls in a flat grid with a border of walls around
+        # the maze, so that cell (i, j) is at index (i + 1) * stride + j + 1
+        # and finding the neighbors of a cell needs no bounds checks
+        self.stride = self.width + 2
+        self.grid = bytearray(b"\x01") * (self.stride * (self.height + 2))
+
+        # Keep track of the cost of entering every cell marked with a digit
+        # (any other open cell costs 1)
+        self.costs = {}
+        for i, line in enumerate(contents):
+            if "A" in line:
+                self.start = (i, line.index("A"))
+            if "B" in line:
+                self.goal = (i, line.index("B"))
+            for match in DIGITS.finditer(line):
+                self.costs[(i, match.start())] = int(match.group())
+
+            # Cells past the end of a short line are open
+            row = line.encode("latin-1", "replace").translate(WALLS)
+            start = self.index((i, 0))
+            self.grid[start:start + self.width] = row + bytes(self.width - len(line))
+        self.grid_costs = {self.index(cell): cost for cell, cost in self.costs.items()}
+
+        # Moves to the neighbors of a cell, as offsets in the grid,
+        # in the order they are tried
+        self.moves = (
+            ("up", -self.stride),
+            ("down", self.stride),
+            ("left", -1),
+            ("right", 1)
+        )
 
         self.solution = None
 
+        # Built from the grid and the explored indices only when asked for
+        self.wall_rows = None
+        self.explored_cells = None
+
+
+    @property
+    def walls(self):
+        """Rows of booleans, True for the walls of the maze."""
+        if self.wall_rows is None:
+            self.wall_rows = []
+            for i in range(self.height):
+                start = self.index((i, 0))
+                self.wall_rows.append([bool(wall) for wall in self.grid[start:start + self.width]])
+        return self.wall_rows
+
+
+    @property
+    def explored(self):
+        """Set of the cells explored by the last search."""
+        if self.explored_cells is None:
+            self.explored_cells = {self.cell(index) for index in self.explored_indices}
+        return self.explored_cells
+
+
+    def index(self, cell):
+        """Index in the grid of a (row, col) cell."""
+        return (cell[0] + 1) * self.stride + cell[1] + 1
+
+
+    def cell(self, index):
+        """(row, col) cell at an index in the grid."""
+        row, col = divmod(index, self.stride)
+        return (row - 1, col - 1)
+
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
-        print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
-                elif (i, j) == self.start:
-                    print("A", end="")
-                elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
-                else:
-                    print(" ", end="")
-            print()
-        print()
+        solution = self.solution[1] if self.solution is not None else []
+
+        # Mark the cells that are not walls or empty, row by row
+        marks = {}
+        for cell in solution:
+            marks.setdefault(cell[0], {})[cell[1]] = "*"
+        marks.setdefault(self.start[0], {})[self.start[1]] = "A"
+        marks.setdefault(self.goal[0], {})[self.goal[1]] = "B"
+
+        lines = []
+        for i in range(self.height):
+            start = self.index((i, 0))
+            line = self.grid[start:start + self.width].translate(TEXT).decode()
+            if i in marks:
+                chars = list(line)
+                for j, char in marks[i].items():
+                    chars[j] = char
+                line = "".join(chars)
+            lines.append(line.replace("#", "█"))
+        print("\n" + "\n".join(lines) + "\n")
 
 
     def neighbors(self, state):
-        row, col = state
-        candidates = [
-            ("up", (row - 1, col)),
-            ("down", (row + 1, col)),
-            ("left", (row, col - 1)),
-            ("right", (row, col + 1))
-        ]
-
-        result = []
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
-                result.append((action, (r, c)))
-        return result
-
-
-    def solve(self):
+        return [(action, self.cell(index))
+                for action, index in self.grid_neighbors(self.index(state))]
+
+
+    def grid_neighbors(self, index):
+        """(action, index) pairs of the open cells next to a grid index."""
+        grid = self.grid
+        return [(action, index + offset) for action, offset in self.moves
+                if not grid[index + offset]]
+
+
+    def cost(self, state):
+        """Cost of moving into a cell."""
+        return self.costs.get(state, 1)
+
+
+    def heuristic(self, state):
+        """Manhattan distance from a cell to the goal."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+
+    def grid_heuristic(self, index):
+        """Manhattan distance from a grid index to the goal."""
+        row, col = divmod(index, self.stride)
+        goal_row, goal_col = divmod(self.index(self.goal), self.stride)
+        return abs(row - goal_row) + abs(col - goal_col)
+
+
+    def solve(self, algorithm="dfs", stats=None):
         """Finds a solution to maze, if one exists."""
+        if algorithm in ("dfs", "bfs"):
+            self.solve_uninformed(algorithm, stats)
+        elif algorithm in ("greedy", "astar", "dijkstra"):
+            self.solve_best_first(algorithm, stats)
+        elif algorithm in ("jps", "jps8"):
+            self.solve_jump_points(algorithm == "jps8", stats)
+        else:
+            raise Exception(f"unknown algorithm {algorithm}")
+
+
+    def solve_uninformed(self, algorithm, stats=None):
+        """Finds a solution with depth-first or breadth-first search."""
+        if stats is None:
+            stats = SearchStats()
 
         # Keep track of number of states explored
         self.num_explored = 0
 
+        # Search over grid indices, converted back to cells when needed
+        goal = self.index(self.goal)
+
         # Initialize frontier to just the starting position
-        start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
+        start = Node(state=self.index(self.start), parent=None, action=None)
+        frontier = StackFrontier() if algorithm == "dfs" else QueueFrontier()
         frontier.add(start)
 
         # Initialize an empty explored set
-        self.explored = set()
+        explored = self.explored_indices = set()
+        self.explored_cells = None
 
         # Keep looping until solution found
         while True:
@@ -138,92 +321,438 @@ class Maze():
                 raise Exception("no solution")
 
             # Choose a node from the frontier
+            stats.expand(len(frontier.frontier))
             node = frontier.remove()
             self.num_explored += 1
 
             # If node is the goal, then we have a solution
-            if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
+            if node.state == goal:
+                self.solution_found(node)
                 return
 
             # Mark node as explored
-            self.explored.add(node.state)
+            explored.add(node.state)
 
             # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
+            stats.neighbor_calls += 1
+            for action, state in self.grid_neighbors(node.state):
+                if not frontier.contains_state(state) and state not in explored:
                     child = Node(state=state, parent=node, action=action)
                     frontier.add(child)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
+    def solve_best_first(self, algorithm, stats=None):
+        """
+        Finds a solution expanding the most promising cell first:
+        the closest to the goal (greedy), the cheapest to reach (dijkstra)
+        or the one with the lowest cost plus heuristic (astar).
+        """
+        if stats is None:
+            stats = SearchStats()
+        if algorithm == "greedy":
+            priority = lambda node: self.grid_heuristic(node.state)
+        elif algorithm == "astar":
+            priority = self.astar_priority(self.grid_heuristic)
+        else:
+            priority = lambda node: node.cost
 
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
+        # Keep track of number of states explored
+        self.num_explored = 0
 
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
+        # Search over grid indices, converted back to cells when needed
+        start = self.index(self.start)
+        goal = self.index(self.goal)
 
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
+        # Initialize frontier to just the starting position
+        frontier = PriorityFrontier(priority)
+        frontier.add(Node(state=start, parent=None, action=None))
 
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
+        # Initialize an empty explored set, and the cheapest cost
+        # found so far to reach every cell in the frontier
+        explored = self.explored_indices = set()
+        self.explored_cells = None
+        best_cost = {start: 0}
 
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
+        while True:
 
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
+            # If nothing left in frontier, then no path
+            if frontier.empty():
+                raise Exception("no solution")
 
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
+            # Choose a node from the frontier, skipping cells that were
+            # already reached in a cheaper way
+            node = frontier.remove()
+            if node.state in explored:
+                continue
+            stats.expand(len(frontier.frontier) + 1)
+            self.num_explored += 1
 
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
+            # If node is the goal, then we have a solution
+            if node.state == goal:
+                self.solution_found(node)
+                return
+
+            # Mark node as explored
+            explored.add(node.state)
+
+            # Add neighbors to frontier, or update their cost if cheaper
+            stats.neighbor_calls += 1
+            for action, state in self.grid_neighbors(node.state):
+                cost = node.cost + self.grid_costs.get(state, 1)
+                if state not in explored and cost < best_cost.get(state, math.inf):
+                    best_cost[state] = cost
+                    frontier.add(Node(state=state, parent=node, action=action, cost=cost))
+
+
+    def astar_priority(self, heuristic):
+        """
+        Returns the A* priority of nodes for a heuristic: cost plus
+        heuristic, and among equal ones, the node closest to the goal
+        first, so that open areas are not expanded whole.
+        """
+        def priority(node):
+            estimate = heuristic(node.state)
+            return (node.cost + estimate, estimate)
+        return priority
+
+
+    def solve_jump_points(self, diagonal=False, stats=None):
+        """
+        Finds a solution with Jump Point Search: an A* search that only
+        expands the cells where a shortest path may have to turn (jump
+        points), jumping over the runs of open cells in between.
+        Only works when every cell costs 1.
+
+        With diagonal, cells also connect diagonally: diagonal moves
+        cost the square root of 2 and cannot cut the corner of a wall.
+        """
+        if self.costs:
+            raise Exception("jump point search needs a maze without costs")
+        if stats is None:
+            stats = SearchStats()
+        goal = self.index(self.goal)
+        if diagonal:
+            priority = self.astar_priority(lambda index: self.octile_distance(index, goal))
+        else:
+            priority = self.astar_priority(self.grid_heuristic)
+
+        # Keep track of number of states explored
+        self.num_explored = 0
+
+        # Initialize frontier to just the starting position
+        start = self.index(self.start)
+        frontier = PriorityFrontier(priority)
+        frontier.add(Node(state=start, parent=None, action=None))
+
+        # Initialize an empty explored set, the cheapest cost found so far
+        # to reach every jump point in the frontier, and the jump points
+        # reached by the cached straight jumps from every cell, for every step
+        explored = self.explored_indices = set()
+        self.explored_cells = None
+        steps = (-1, 1, -self.stride, self.stride) if diagonal else (-1, 1)
+        self.jump_cache = {step: array("i", [UNKNOWN_JUMP]) * len(self.grid) for step in steps}
+        best_cost = {start: 0}
+
+        while True:
+
+            # If nothing left in frontier, then no path
+            if frontier.empty():
+                raise Exception("no solution")
+
+            # Choose a node from the frontier, skipping jump points that
+            # were already reached in a cheaper way
+            node = frontier.remove()
+            if node.state in explored:
+                continue
+            stats.expand(len(frontier.frontier) + 1)
+            self.num_explored += 1
+
+            # If node is the goal, then we have a solution
+            if node.state == goal:
+                self.jump_solution_found(node)
+                return
+
+            # Mark node as explored
+            explored.add(node.state)
+
+            # Add the jump points reached from node to the frontier,
+            # with the step taken to reach them as the action
+            stats.neighbor_calls += 1
+            for step in self.jump_steps(node, diagonal):
+                state = self.jump(node.state, step, goal, diagonal)
+                if state is None:
+                    continue
+                cost = node.cost + self.octile_distance(node.state, state)
+                if state not in explored and cost < best_cost.get(state, math.inf):
+                    best_cost[state] = cost
+                    frontier.add(Node(state=state, parent=node, action=step, cost=cost))
+
+
+    def jump_steps(self, node, diagonal):
+        """
+        Steps worth jumping in from a jump point, given the step that led
+        to it: forward, and to the sides where a wall may force a turn.
+        """
+        stride = self.stride
+        if node.parent is None:
+            steps = [-stride, stride, -1, 1]
+            if diagonal:
+                steps += [-stride - 1, -stride + 1, stride - 1, stride + 1]
+        else:
+            step = node.action
+            vertical, horizontal = self.split_step(step)
+            sides = (-1, 1) if vertical else (-stride, stride)
+            if vertical and horizontal:
+                steps = [vertical, horizontal, step]
+            elif diagonal:
+                steps = [step, *sides, *(step + side for side in sides)]
+            else:
+                steps = [step, *sides]
+        return [step for step in steps if self.can_move(node.state, step)]
+
+
+    def jump(self, index, step, goal, diagonal):
+        """
+        Moves from a grid index by step until reaching a jump point,
+        which is returned, or a dead end, in which case returns None.
+        """
+        vertical, horizontal = self.split_step(step)
+
+        # A diagonal move reaches a jump point where a straight jump does
+        if vertical and horizontal:
+            while True:
+                index += step
+                if index == goal:
+                    return index
+                if (self.jump(index, horizontal, goal, diagonal) is not None
+                        or self.jump(index, vertical, goal, diagonal) is not None):
+                    return index
+                if not self.can_move(index, step):
+                    return None
+
+        # Straight jumps are repeated from every cell of diagonal jumps, and
+        # horizontal ones from every cell of vertical jumps without diagonal
+        # moves, so the jump point they reach is cached, one array per step,
+        # for every cell they cross: jumping the same way from any of them
+        # reaches it too
+        cached = diagonal or not vertical
+        if cached:
+            known = self.jump_cache[step]
+            if known[index] != UNKNOWN_JUMP:
+                return None if known[index] == NO_JUMP else known[index]
+
+        # A straight move reaches a jump point next to a wall that ends,
+        # where a shortest path may turn around the corner
+        found, end = self.straight_jump(index, step, goal, diagonal)
+        if cached:
+            crossed = len(range(index, end, step))
+            known[index:end:step] = array("i", [NO_JUMP if found is None else found]) * crossed
+        return found
+
+
+    def straight_jump(self, index, step, goal, diagonal):
+        """
+        Moves from a grid index by a straight step until reaching a jump
+        point or a wall, and returns the jump point (None at a wall) and
+        the grid index where the move stopped.
+        """
+        grid = self.grid
+        vertical = step in (-self.stride, self.stride)
+        sides = (-1, 1) if vertical else (-self.stride, self.stride)
+        while True:
+            index += step
+            if grid[index]:
+                return None, index
+            if index == goal:
+                return index, index
+            for side in sides:
+                if not grid[index + side] and grid[index - step + side]:
+                    return index, index
+
+            # Without diagonal moves, a vertical move also reaches a jump
+            # point where a horizontal jump does
+            if vertical and not diagonal:
+                for side in sides:
+                    if self.jump(index, side, goal, diagonal) is not None:
+                        return index, index
+
+
+    def can_move(self, index, step):
+        """
+        Returns True if the cell a step away from a grid index is open,
+        and for diagonal steps, if both cells the step goes between are too.
+        """
+        vertical, horizontal = self.split_step(step)
+        grid = self.grid
+        return not (grid[index + step] or grid[index + vertical] or grid[index + horizontal])
+
+
+    def split_step(self, step):
+        """Splits a step into its vertical and horizontal offsets."""
+        vertical = round(step / self.stride) * self.stride
+        return vertical, step - vertical
+
+
+    def octile_distance(self, a, b):
+        """
+        Length of the shortest path between two grid indices
+        if there were no walls, with diagonal moves.
+        """
+        rows = abs(a // self.stride - b // self.stride)
+        cols = abs(a % self.stride - b % self.stride)
+        return max(rows, cols) + (math.sqrt(2) - 1) * min(rows, cols)
+
+
+    def jump_solution_found(self, node):
+        """
+        Stores the actions and cells leading to node as the solution,
+        filling in the cells between jump points one step at a time.
+        """
+        actions = []
+        cells = []
+        while node.parent is not None:
+            step = node.action
+            vertical, horizontal = self.split_step(step)
+            action = "-".join(name for name, offset in self.moves if offset in (vertical, horizontal))
+            index = node.state
+            while index != node.parent.state:
+                actions.append(action)
+                cells.append(self.cell(index))
+                index -= step
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
+
+
+    def solution_found(self, node):
+        """Stores the actions and cells leading to node as the solution."""
+        actions = []
+        cells = []
+        while node.parent is not None:
+            actions.append(node.action)
+            cells.append(self.cell(node.state))
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
+
+
+    def distance_field(self, source=None):
+        """
+        Returns the number of steps from source (the start by default)
+        to every cell, as a flat array of height * width integers in row
+        order, with -1 for walls and unreachable cells.
+
+        Whole BFS levels are expanded at once with NumPy if it is
+        installed, or one cell at a time otherwise.
+        """
+        source = self.index(self.start if source is None else source)
+        try:
+            import numpy
+        except ImportError:
+            distances = self.flood_fill(source)
+            field = array("i")
+            for i in range(self.height):
+                start = self.index((i, 0))
+                field.extend(distances[start:start + self.width])
+            return field
+
+        distances = self.flood_fill_numpy(numpy, source)
+        inner = distances.reshape(self.height + 2, self.stride)[1:-1, 1:-1]
+        return array("i", inner.tobytes())
+
+
+    def flood_fill(self, source):
+        """Steps from a grid index to every grid index, with a BFS."""
+        grid = self.grid
+        offsets = [offset for _, offset in self.moves]
+        distances = array("i", [-1]) * len(grid)
+        distances[source] = 0
+        queue = deque([source])
+        while queue:
+            index = queue.popleft()
+            distance = distances[index] + 1
+            for offset in offsets:
+                neighbor = index + offset
+                if not grid[neighbor] and distances[neighbor] < 0:
+                    distances[neighbor] = distance
+                    queue.append(neighbor)
+        return distances
+
+
+    def flood_fill_numpy(self, numpy, source):
+        """Steps from a grid index to every grid index, a BFS level at a time."""
+        open_cells = numpy.frombuffer(self.grid, dtype=numpy.uint8) == 0
+        offsets = numpy.array([offset for _, offset in self.moves])
+        distances = numpy.full(len(self.grid), -1, dtype=numpy.int32)
+        distances[source] = 0
+        level = numpy.array([source])
+        distance = 0
+        while level.size:
+            distance += 1
+            candidates = (level[:, None] + offsets).ravel()
+            candidates = candidates[open_cells[candidates] & (distances[candidates] < 0)]
+            level = numpy.unique(candidates)
+            distances[level] = distance
+        return distances
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False,
+                     cell_size=50, cell_border=2):
+        from PIL import Image, ImageDraw
+
+        # Color every cell of the grid, border included, as one pixel
+        # with the palette index of its kind
+        pixels = self.grid.translate(PIXELS)
+        stride = self.stride
+        if self.solution is not None and show_explored:
+            for index in self.explored_indices:
+                pixels[index] = EXPLORED
+        if self.solution is not None and show_solution:
+            for i, j in self.solution[1]:
+                pixels[(i + 1) * stride + j + 1] = SOLUTION
+        pixels[self.index(self.start)] = START
+        pixels[self.index(self.goal)] = GOAL
+
+        # Scale the maze without its border up to the size of the cells
+        img = Image.frombytes("P", (self.stride, self.height + 2), bytes(pixels))
+        img.putpalette(PALETTE)
+        img = img.crop((1, 1, self.width + 1, self.height + 1)).resize(
+            (self.width * cell_size, self.height * cell_size), Image.NEAREST
+        )
+
+        # Draw the black lines around every cell, a row and a column
+        # at a time: cell_border pixels before it and one less after it
+        draw = ImageDraw.Draw(img)
+        width, height = img.size
+        for start in range(0, max(width, height), cell_size):
+            end = start + cell_size - 1
+            for first, last in ((start, start + cell_border - 1), (end - cell_border + 2, end)):
+                if first <= last:
+                    draw.rectangle([(0, first), (width - 1, last)], fill=BLACK)
+                    draw.rectangle([(first, 0), (last, height - 1)], fill=BLACK)
 
         img.save(filename)
 
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
+# Algorithms that can be passed to Maze.solve
+SOLVERS = ("dfs", "bfs", "greedy", "astar", "dijkstra", "jps", "jps8")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        sys.exit(f"Usage: python maze.py maze.txt [{'|'.join(SOLVERS)}]")
+    algorithm = sys.argv[2] if len(sys.argv) == 3 else "dfs"
+    if algorithm not in SOLVERS:
+        sys.exit(f"Unknown algorithm, choose one of: {', '.join(SOLVERS)}")
 
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+    m = Maze(sys.argv[1])
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(algorithm)
+    print("States Explored:", m.num_explored)
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
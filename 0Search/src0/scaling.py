@@ -0,0 +1,108 @@
+import argparse
+import csv
+import os
+import sys
+import tempfile
+
+import generate
+import maze
+
+# Side lengths of the square mazes, and seed used to generate them
+SIZES = (10, 100, 500, 1000, 2000, 4000)
+SEED = 0
+DENSITY = 0.3
+
+FIELDS = [
+    "generator", "size", "algorithm", "solved", "explored", "solution_length",
+    "nodes_expanded", "frontier_peak", "neighbor_calls", "wall_time", "peak_memory",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Times every Maze solver on growing mazes.")
+    parser.add_argument("--memory", action="store_true",
+                        help="trace the peak memory of every search, in a separate run "
+                             "so that tracing does not distort the wall times")
+    parser.add_argument("--sizes", type=size_list, default=SIZES,
+                        help="comma-separated side lengths of the square mazes")
+    parser.add_argument("--density", type=generate.fraction, default=DENSITY,
+                        help="wall density of obstacle grids")
+    parser.add_argument("generators", nargs="*", metavar="generator",
+                        help=f"generators to use (default: {', '.join(generate.GENERATORS)})")
+    args = parser.parse_args()
+    for name in args.generators:
+        if name not in generate.GENERATORS:
+            parser.error(f"unknown generator {name}, choose from {', '.join(generate.GENERATORS)}")
+    generators = args.generators or list(generate.GENERATORS)
+    trace_memory, sizes, density = args.memory, args.sizes, args.density
+
+    writer = csv.DictWriter(sys.stdout, FIELDS)
+    writer.writeheader()
+    with tempfile.TemporaryDirectory() as directory:
+        for name in generators:
+            for size in sizes:
+                filename = os.path.join(directory, f"{name}{size}.txt")
+                generate.write_maze(generate_maze(name, size, density), filename)
+                for algorithm in maze.SOLVERS:
+                    writer.writerow(run_solver(name, size, algorithm, filename, trace_memory))
+                    sys.stdout.flush()
+                os.remove(filename)
+
+
+def size_list(text):
+    """
+    argparse type of the comma-separated sizes, which every generator must accept.
+    """
+    sizes = [int(size) for size in text.split(",")]
+    if any(size < 3 for size in sizes):
+        raise argparse.ArgumentTypeError(f"every size must be at least 3, not {text}")
+    return sizes
+
+
+def generate_maze(name, size, density):
+    """
+    Returns the lines of the maze of a generator for a size,
+    the same on every run.
+    """
+    if name == "obstacles":
+        return generate.obstacles(size, size, density, SEED)
+    return generate.GENERATORS[name](size, size, SEED)
+
+
+def run_solver(name, size, algorithm, filename, trace_memory):
+    """
+    Solves the maze in filename with an algorithm and returns a CSV row,
+    with the peak memory of a second, traced run if trace_memory is True.
+    """
+    m, stats = solve(filename, algorithm, maze.SearchStats())
+    if trace_memory:
+        _, traced = solve(filename, algorithm, maze.SearchStats(trace_memory=True))
+        stats.peak_memory = traced.peak_memory
+    return {
+        "generator": name,
+        "size": size,
+        "algorithm": algorithm,
+        "solved": m.solution is not None,
+        "explored": m.num_explored,
+        "solution_length": None if m.solution is None else len(m.solution[0]),
+        **stats.as_dict(),
+    }
+
+
+def solve(filename, algorithm, stats):
+    """
+    Loads a maze and measures solving it, returning the maze and the stats.
+    Mazes without a path are measured too.
+    """
+    m = maze.Maze(filename)
+    with stats.measure():
+        try:
+            m.solve(algorithm, stats)
+        except Exception as e:
+            if str(e) != "no solution":
+                raise
+    return m, stats
+
+
+if __name__ == "__main__":
+    main()